@@ -0,0 +1,207 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+from pymongo.errors import OperationFailure, PyMongoError
+from app.config import (
+    SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL, QUESTION_CACHE_SIZE, QUESTION_CACHE_TTL, CHANGE_STREAM_RETRY_DELAY
+)
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Server error codes after which a change stream cannot be reopened or resumed
+CHANGE_STREAMS_UNSUPPORTED = 40573  # not a replica set or sharded cluster
+CHANGE_STREAM_HISTORY_LOST = 286  # resume token fell off the oplog
+
+class LRUCache:
+    """Bounded least-recently-used cache whose entries also expire after a TTL
+
+    weigh, if given, sizes each value so the total held is reported in stats.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, weigh: Optional[Callable[[Any], int]] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.weigh = weigh
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.weight = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a live entry and mark it recently used; None on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.pop(key)
+        self.misses += 1
+        return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        self.pop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        if self.weigh:
+            self.weight += self.weigh(value)
+        while len(self._entries) > self.max_entries:
+            self.pop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None and self.weigh:
+            self.weight -= self.weigh(entry[1])
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.weight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats = {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+        if self.weigh:
+            stats["bytes"] = self.weight
+        return stats
+
+class SearchResultCache:
+    """Caches search responses until the next write to the questions collection
+
+    Writers bump the epoch, which drops every entry. A result computed while a
+    write happened is not stored, so a slow query cannot cache pre-write data.
+    The epoch is per process; writes from other processes are bounded by the TTL.
+    """
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_SIZE, ttl: float = SEARCH_CACHE_TTL):
+        self.epoch = 0
+        self._cache = LRUCache(max_entries, ttl)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Normalize filters and pagination arguments into a cache key"""
+        return json.dumps(parts, sort_keys=True, default=str)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    def set(self, key: str, result: Dict[str, Any], epoch: int) -> None:
+        """Store a result computed during the given epoch, unless a write has since happened"""
+        if epoch == self.epoch:
+            self._cache.set(key, result)
+
+    def bump_epoch(self) -> None:
+        """Invalidate every cached result after a mutation"""
+        self.epoch += 1
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"epoch": self.epoch, **self._cache.stats()}
+
+search_cache = SearchResultCache()
+
+class QuestionCache:
+    """Read-through cache of serialized question response bodies and their ETags, keyed by id
+
+    Writers invalidate the ids they change, which also bumps the generation so
+    a read that raced with the write does not store the old document. Writes
+    from other processes arrive through QuestionCacheInvalidator, or are
+    bounded by the TTL where change streams are unavailable.
+    """
+
+    def __init__(self, max_entries: int = QUESTION_CACHE_SIZE, ttl: float = QUESTION_CACHE_TTL):
+        self.generation = 0
+        self._cache = LRUCache(max_entries, ttl, weigh=lambda entry: len(entry[0]))
+
+    def get(self, question_id: str) -> Optional[Tuple[bytes, str]]:
+        """The cached (payload, etag) of a question; None on a miss"""
+        return self._cache.get(str(question_id))
+
+    def set(self, question_id: str, payload: bytes, etag: str, generation: int) -> None:
+        """Store a payload read during the given generation, unless an invalidation has since happened"""
+        if generation == self.generation:
+            self._cache.set(str(question_id), (payload, etag))
+
+    def invalidate(self, *question_ids: Any) -> None:
+        self.generation += 1
+        for question_id in question_ids:
+            self._cache.pop(str(question_id))
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"generation": self.generation, **self._cache.stats()}
+
+question_cache = QuestionCache()
+
+class QuestionCacheInvalidator:
+    """Follows a change stream on questions and invalidates what other processes change"""
+
+    def __init__(self, cache: QuestionCache, retry_delay: float = CHANGE_STREAM_RETRY_DELAY):
+        self.cache = cache
+        self.retry_delay = retry_delay
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(db))
+
+    async def _run(self, db: AsyncIOMotorDatabase) -> None:
+        resume_after = None
+        pipeline = [{"$project": {"operationType": 1, "documentKey": 1}}]
+        while True:
+            try:
+                async with db["questions"].watch(pipeline, resume_after=resume_after) as stream:
+                    async for change in stream:
+                        resume_after = change["_id"]
+                        self.apply(change)
+                # The stream was invalidated (collection dropped or renamed); start a new one
+                resume_after = None
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    logger.warning("Change streams unavailable; question cache relies on its TTL across processes")
+                    return
+                if e.code == CHANGE_STREAM_HISTORY_LOST:
+                    resume_after = None
+                logger.error(f"Question change stream failed: {e}")
+                self.cache.clear()
+                await asyncio.sleep(self.retry_delay)
+            except PyMongoError as e:
+                # Changes made while disconnected are replayed from the resume token, if there is one
+                logger.error(f"Question change stream failed: {e}")
+                if resume_after is None:
+                    self.cache.clear()
+                await asyncio.sleep(self.retry_delay)
+
+    def apply(self, change: Dict[str, Any]) -> None:
+        """Invalidate the question a change touched, or everything if the collection went away"""
+        operation = change.get("operationType")
+        if operation in ("update", "replace", "delete"):
+            self.cache.invalidate(change["documentKey"]["_id"])
+        elif operation in ("drop", "rename", "dropDatabase", "invalidate"):
+            self.cache.clear()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+question_cache_invalidator = QuestionCacheInvalidator(question_cache)
@@ -10,10 +10,17 @@ API_KEY = os.getenv("API_KEY", "your-api-key-here")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 DEBUG = os.getenv("DEBUG", "true").lower() == "true"
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Validate list responses against their Pydantic models; off, raw documents are encoded directly
+VALIDATE_RESPONSES = os.getenv("VALIDATE_RESPONSES", str(DEBUG)).lower() == "true"
 
 # Pagination defaults
 DEFAULT_PAGE_SIZE = 10
 MAX_PAGE_SIZE = 100
+MAX_FACET_VALUES = 50  # most common values returned per search facet
+
+# Multi-get settings
+MAX_BATCH_GET_IDS = 1000  # ids accepted by one batch-get request
+BATCH_GET_CHUNK_SIZE = 500  # ids per $in query
 
 # Idempotency settings
 IDEMPOTENCY_TTL = 3600  # 1 hour in seconds
@@ -21,3 +28,51 @@ IDEMPOTENCY_TTL = 3600  # 1 hour in seconds
 # Bulk operation settings
 BULK_BATCH_SIZE = 100
 MAX_BULK_SIZE = 10000
+BULK_WRITE_BATCH_SIZE = 1000  # rows per bulk_write round trip for bulk updates/deletes
+
+# Import checkpoints are kept this long so retried uploads can resume
+IMPORT_CHECKPOINT_TTL = 7 * 24 * 3600  # 7 days in seconds
+
+# Background job settings
+JOB_CONCURRENCY = 2  # bulk jobs run at once per process
+MAX_JOB_ERRORS = 1000  # row errors kept on a job document
+JOB_HEARTBEAT_INTERVAL = 30  # seconds between liveness updates of a process's jobs
+JOB_STALE_AFTER = 120  # queued/running jobs without a heartbeat this long are marked failed
+
+# Bulk import validation settings
+VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", "2"))  # per API process; 0 validates in-process
+VALIDATION_INLINE_ROWS = 20  # smaller chunks are validated in-process
+
+# Streaming upload settings
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes read from an upload at a time
+MAX_IMPORT_ROW_BYTES = 1024 * 1024  # largest single row accepted in a streamed import
+EXPORT_BATCH_SIZE = 1000  # documents fetched per cursor round trip when exporting
+MAX_EXPORT_PARTITIONS = 16  # concurrent _id-range cursors for a partitioned export
+EXPORT_SAMPLES_PER_PARTITION = 20  # sampled _ids used to place each range boundary
+
+# In-process BM25 search index; keep disabled when several API processes write
+SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "false").lower() == "true"
+BM25_K1 = 1.2  # term frequency saturation
+BM25_B = 0.75  # document length normalization
+SEARCH_INDEX_MAX_IDS = 10000  # index matches handed to MongoDB as an _id $in filter
+
+# Materialized statistics are recounted this often to correct drift
+STATS_RECONCILE_INTERVAL = 3600  # 1 hour in seconds
+
+# Search result cache; entries are dropped on every write and expire after the TTL
+SEARCH_CACHE_SIZE = 1024  # cached responses; 0 disables the cache
+SEARCH_CACHE_TTL = 30  # seconds
+
+# Question read-through cache; entries are invalidated on write and expire after the TTL
+QUESTION_CACHE_SIZE = 10000  # cached questions; 0 disables the cache
+QUESTION_CACHE_TTL = 300  # seconds; bounds staleness from other processes without change streams
+QUESTION_CACHE_CHANGE_STREAM = os.getenv("QUESTION_CACHE_CHANGE_STREAM", "true").lower() == "true"
+CHANGE_STREAM_RETRY_DELAY = 5  # seconds before reopening a failed change stream
+
+# Index advisor: query shapes slower than this get an explain() summary
+SLOW_QUERY_MS = 100
+INDEX_ADVISOR_MAX_SHAPES = 500  # distinct query shapes tracked per process
+
+# Exam paper assembly
+EXAM_SAMPLE_FACTOR = 3  # candidates sampled per requested question in each difficulty bucket
+EXAM_RETRY_SAMPLE_FACTOR = 10  # used for a second attempt when the first sample cannot meet the constraints
@@ -1,5 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from app.config import MONGODB_URL, DB_NAME
+from app.config import MONGODB_URL, DB_NAME, IMPORT_CHECKPOINT_TTL
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -29,6 +29,13 @@ class Database:
             await questions.create_index("source_id")
             await questions.create_index([("metadata.difficulty", 1)])
             await questions.create_index([("created_at", -1)])
+            await questions.create_index([("created_at", 1), ("_id", 1)])
+            await questions.create_index("fingerprint", unique=True, sparse=True)
+            await questions.create_index(
+                [("text", "text"), ("explanation", "text"), ("metadata.tags", "text")],
+                weights={"text": 10, "metadata.tags": 5, "explanation": 2},
+                name="questions_text"
+            )
             
             # Idempotency key index
             idempotency = cls.db["idempotency_keys"]
@@ -40,4 +47,13 @@ class Database:
             await events.create_index([("created_at", -1)])
             await events.create_index("entity_id")
             
+            # Jobs collection index
+            jobs = cls.db["jobs"]
+            await jobs.create_index([("created_at", -1)])
+            
+            # Import checkpoint indexes
+            checkpoints = cls.db["import_checkpoints"]
+            await checkpoints.create_index([("upload_hash", 1), ("format", 1)], unique=True)
+            await checkpoints.create_index("created_at", expireAfterSeconds=IMPORT_CHECKPOINT_TTL)
+            
             print("Indexes created successfully")
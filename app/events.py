@@ -1,6 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from enum import Enum
 import json
 
@@ -18,16 +18,16 @@ class EventService:
         self.db = db
         self.collection_name = "events"
     
-    async def log_event(
+    def build_event(
         self,
         event_type: EventType,
         entity_id: str,
         entity_type: str,
         changes: Optional[Dict[str, Any]] = None,
         user_id: Optional[str] = None
-    ) -> None:
-        """Log an event to the database"""
-        event = {
+    ) -> Dict[str, Any]:
+        """Build an event document without writing it"""
+        return {
             "event_type": event_type.value,
             "entity_id": entity_id,
             "entity_type": entity_type,
@@ -35,8 +35,38 @@ class EventService:
             "user_id": user_id,
             "created_at": datetime.utcnow()
         }
+    
+    async def log_event(
+        self,
+        event_type: EventType,
+        entity_id: str,
+        entity_type: str,
+        changes: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None
+    ) -> None:
+        """Log an event to the database"""
+        event = self.build_event(event_type, entity_id, entity_type, changes, user_id)
         await self.db[self.collection_name].insert_one(event)
     
+    async def log_events(
+        self,
+        event_type: EventType,
+        entity_ids: List[str],
+        entity_type: str,
+        changes: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None
+    ) -> None:
+        """Log one event per entity with a single insert_many round trip"""
+        await self.insert_events([
+            self.build_event(event_type, entity_id, entity_type, changes, user_id)
+            for entity_id in entity_ids
+        ])
+    
+    async def insert_events(self, events: List[Dict[str, Any]]) -> None:
+        """Write pre-built events with a single insert_many round trip"""
+        if events:
+            await self.db[self.collection_name].insert_many(events, ordered=False)
+    
     async def get_events(
         self,
         entity_id: Optional[str] = None,
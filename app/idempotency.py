@@ -2,7 +2,9 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
 from datetime import datetime
 import hashlib
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from pymongo import ReturnDocument
+from app.config import MAX_JOB_ERRORS
 
 class IdempotencyService:
     """Handles idempotent requests to ensure safe retries"""
@@ -35,3 +37,59 @@ class IdempotencyService:
     async def generate_key(self, data: str) -> str:
         """Generate idempotency key from request data"""
         return hashlib.sha256(data.encode()).hexdigest()
+
+class ImportCheckpointService:
+    """Tracks how far an upload has been imported so retries can resume"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection_name = "import_checkpoints"
+    
+    async def start(self, upload_hash: str, file_format: str, on_duplicate: str) -> Dict[str, Any]:
+        """Return the existing checkpoint or create an empty one"""
+        now = datetime.utcnow()
+        return await self.db[self.collection_name].find_one_and_update(
+            {"upload_hash": upload_hash, "format": file_format, "on_duplicate": on_duplicate},
+            {
+                "$setOnInsert": {
+                    "next_row": 0,
+                    "imported": 0,
+                    "failed": 0,
+                    "duplicates": 0,
+                    "errors": [],
+                    "created_at": now
+                },
+                "$set": {"updated_at": now}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def advance(
+        self,
+        checkpoint_id: ObjectId,
+        next_row: int,
+        imported: int,
+        failed: int,
+        duplicates: int,
+        errors: List[Dict[str, Any]]
+    ) -> None:
+        """Record a committed batch"""
+        await self.db[self.collection_name].update_one(
+            {"_id": checkpoint_id},
+            {
+                "$set": {"next_row": next_row, "updated_at": datetime.utcnow()},
+                "$inc": {"imported": imported, "failed": failed, "duplicates": duplicates},
+                "$push": {"errors": {"$each": errors, "$slice": MAX_JOB_ERRORS}}
+            }
+        )
+    
+    async def complete(self, checkpoint_id: ObjectId) -> None:
+        """Drop the checkpoint of a fully imported upload so a re-send imports it again"""
+        await self.db[self.collection_name].delete_one({"_id": checkpoint_id})
+    
+    async def reset(self, upload_hash: str, file_format: str, on_duplicate: str) -> None:
+        """Forget an upload so it is imported again from the start"""
+        await self.db[self.collection_name].delete_one(
+            {"upload_hash": upload_hash, "format": file_format, "on_duplicate": on_duplicate}
+        )
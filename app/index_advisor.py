@@ -0,0 +1,194 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+from app.config import SLOW_QUERY_MS, INDEX_ADVISOR_MAX_SHAPES
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin"}
+# Operators an index cannot serve efficiently; their fields are left out of proposals
+UNINDEXABLE_OPERATORS = {"$regex", "$not", "$exists", "$where", "$expr"}
+
+def query_shape(filters: Dict[str, Any], sort: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    """Reduce a filter and sort to its fields and operator classes, without values"""
+    equality, ranges, unindexable = set(), set(), set()
+
+    def visit(clause: Dict[str, Any]) -> None:
+        for field, condition in clause.items():
+            if field in ("$and", "$or", "$nor"):
+                for branch in condition:
+                    visit(branch)
+            elif field.startswith("$"):
+                unindexable.add(field)
+            elif isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+                if UNINDEXABLE_OPERATORS & set(condition):
+                    unindexable.add(field)
+                elif RANGE_OPERATORS & set(condition):
+                    ranges.add(field)
+                else:
+                    equality.add(field)
+            else:
+                equality.add(field)
+
+    visit(filters)
+    sort_fields = {field for field, _ in sort}
+    return {
+        # A keyset cursor compares created_at both ways; the range dominates
+        "equality": sorted(equality - ranges - unindexable),
+        "sort": [[field, direction] for field, direction in sort],
+        "range": sorted(ranges - sort_fields - unindexable),
+        "unindexable": sorted(unindexable)
+    }
+
+def propose_index(shape: Dict[str, Any]) -> Optional[List[Tuple[str, int]]]:
+    """Compound index keys in Equality, Sort, Range order; None if no index would help"""
+    if "$text" in shape["unindexable"]:
+        return None
+    sort_fields = [field for field, _ in shape["sort"]]
+    keys = [(field, 1) for field in shape["equality"] if field not in sort_fields]
+    keys += [(field, direction) for field, direction in shape["sort"] if isinstance(direction, int)]
+    keys += [(field, 1) for field in shape["range"]]
+    if not keys or keys[0][0] == "_id":
+        return None
+    return keys
+
+def summarize_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Condense explain() output to the winning plan's stages and work done"""
+    plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+    plan = plan.get("queryPlan", plan)
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage += f"({plan['indexName']})"
+        stages.append(stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    stats = explain.get("executionStats", {})
+    return {
+        "plan": " <- ".join(stages),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "returned": stats.get("nReturned"),
+        "time_ms": stats.get("executionTimeMillis")
+    }
+
+class IndexAdvisor:
+    """Counts and times question query shapes and proposes compound indexes for them"""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, max_shapes: int = INDEX_ADVISOR_MAX_SHAPES):
+        self.slow_ms = slow_ms
+        self.max_shapes = max_shapes
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        self.untracked = 0
+
+    @contextmanager
+    def track(self, filters: Dict[str, Any], sort: List[Tuple[str, Any]]):
+        """Time the query run inside the block and record it under its shape"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(filters, sort, (time.perf_counter() - start) * 1000)
+
+    def record(self, filters: Dict[str, Any], sort: List[Tuple[str, Any]], elapsed_ms: float) -> None:
+        shape = query_shape(filters, sort)
+        key = json.dumps(shape, sort_keys=True)
+        stats = self._shapes.get(key)
+        if stats is None:
+            if len(self._shapes) >= self.max_shapes:
+                self.untracked += 1
+                return
+            stats = self._shapes[key] = {
+                "shape": shape,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "slow": 0,
+                "sample": None
+            }
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        if elapsed_ms >= self.slow_ms:
+            stats["slow"] += 1
+            # Kept with its values so the report can explain() a real slow query
+            stats["sample"] = (filters, sort)
+            logger.warning(f"Slow question query ({elapsed_ms:.0f} ms): {key}")
+
+    async def report(self, db: AsyncIOMotorDatabase, limit: int = 20) -> Dict[str, Any]:
+        """Hottest shapes with timings, explain() summaries of slow ones and index proposals"""
+        existing = await self._existing_indexes(db)
+        hottest = sorted(self._shapes.values(), key=lambda stats: stats["count"], reverse=True)[:limit]
+
+        shapes = []
+        proposals = []
+        for stats in hottest:
+            keys = propose_index(stats["shape"])
+            covered = keys is None or self._covered(keys, existing)
+            entry = {
+                "shape": stats["shape"],
+                "count": stats["count"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 2),
+                "max_ms": round(stats["max_ms"], 2),
+                "slow": stats["slow"],
+                "proposed_index": keys,
+                "covered": covered
+            }
+            if stats["sample"] is not None:
+                entry["explain"] = await self._explain(db, *stats["sample"])
+            shapes.append(entry)
+            if not covered and keys not in [proposal["keys"] for proposal in proposals]:
+                proposals.append({"keys": keys, "count": stats["count"]})
+
+        return {
+            "slow_ms": self.slow_ms,
+            "tracked_shapes": len(self._shapes),
+            "untracked_queries": self.untracked,
+            "shapes": shapes,
+            "proposals": proposals
+        }
+
+    async def apply(self, db: AsyncIOMotorDatabase, min_count: int = 1) -> List[str]:
+        """Create the proposed indexes whose shapes ran at least min_count times"""
+        report = await self.report(db, limit=self.max_shapes)
+        created = []
+        for proposal in report["proposals"]:
+            if proposal["count"] >= min_count:
+                keys = [(field, direction) for field, direction in proposal["keys"]]
+                created.append(await db["questions"].create_index(keys))
+                logger.info(f"Index advisor created index {created[-1]}")
+        return created
+
+    def reset(self) -> None:
+        self._shapes.clear()
+        self.untracked = 0
+
+    @staticmethod
+    async def _existing_indexes(db: AsyncIOMotorDatabase) -> List[List[Tuple[str, Any]]]:
+        info = await db["questions"].index_information()
+        return [list(index["key"]) for index in info.values()]
+
+    @staticmethod
+    def _covered(keys: List[Tuple[str, int]], existing: List[List[Tuple[str, Any]]]) -> bool:
+        """An index whose leading keys match the proposal (in either direction) already serves it"""
+        reverse = [(field, -direction) for field, direction in keys]
+        for index_keys in existing:
+            prefix = [(field, direction) for field, direction in index_keys[:len(keys)]]
+            if prefix in (keys, reverse):
+                return True
+        return False
+
+    @staticmethod
+    async def _explain(db: AsyncIOMotorDatabase, filters: Dict[str, Any], sort: List[Tuple[str, Any]]) -> Dict[str, Any]:
+        try:
+            cursor = db["questions"].find(filters)
+            if sort and "$text" not in filters:
+                cursor = cursor.sort(sort)
+            return summarize_plan(await cursor.explain())
+        except Exception as e:
+            return {"error": str(e)}
+
+index_advisor = IndexAdvisor()
@@ -0,0 +1,246 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, Any, Optional, AsyncIterator, Callable, List, Set
+from pymongo import ReturnDocument
+from app.config import JOB_CONCURRENCY, JOB_HEARTBEAT_INTERVAL, JOB_STALE_AFTER, MAX_JOB_ERRORS
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JobType(str, Enum):
+    IMPORT = "import"
+    UPDATE = "update"
+    DELETE = "delete"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = [JobStatus.QUEUED.value, JobStatus.RUNNING.value]
+
+class JobService:
+    """Persists background job state in the jobs collection"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection_name = "jobs"
+
+    async def create_job(
+        self,
+        job_type: JobType,
+        total: Optional[int] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Record a queued job and return its id"""
+        now = datetime.utcnow()
+        result = await self.db[self.collection_name].insert_one({
+            "type": job_type.value,
+            "status": JobStatus.QUEUED.value,
+            "params": params or {},
+            "total": total,
+            "processed": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "duplicates": 0,
+            "errors": [],
+            "rows_per_second": 0.0,
+            "cancel_requested": False,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "heartbeat_at": now,
+            "started_at": None,
+            "finished_at": None
+        })
+        return str(result.inserted_id)
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by ID"""
+        job = await self.db[self.collection_name].find_one({"_id": ObjectId(job_id)})
+        if job:
+            job["_id"] = str(job["_id"])
+        return job
+
+    async def mark_running(self, job_id: str) -> Optional[datetime]:
+        """Move a queued job to running; None if it was cancelled meanwhile"""
+        now = datetime.utcnow()
+        result = await self.db[self.collection_name].update_one(
+            {"_id": ObjectId(job_id), "status": JobStatus.QUEUED.value},
+            {"$set": {"status": JobStatus.RUNNING.value, "started_at": now, "updated_at": now}}
+        )
+        return now if result.modified_count else None
+
+    async def record_progress(
+        self,
+        job_id: str,
+        result: Dict[str, Any],
+        rows_per_second: float
+    ) -> bool:
+        """Add one chunk's counts to the job; returns True if cancellation was requested"""
+        job = await self.db[self.collection_name].find_one_and_update(
+            {"_id": ObjectId(job_id)},
+            {
+                "$inc": {
+                    "processed": result["processed"],
+                    "succeeded": result["succeeded"],
+                    "failed": result["failed"],
+                    "duplicates": result.get("duplicates", 0)
+                },
+                "$push": {"errors": {"$each": result["errors"], "$slice": MAX_JOB_ERRORS}},
+                "$set": {"rows_per_second": rows_per_second, "updated_at": datetime.utcnow()}
+            },
+            projection={"cancel_requested": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return bool(job and job.get("cancel_requested"))
+
+    async def finish(self, job_id: str, status: JobStatus, error: Optional[str] = None) -> None:
+        """Record the final status of a job"""
+        now = datetime.utcnow()
+        await self.db[self.collection_name].update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {"status": status.value, "error": error, "finished_at": now, "updated_at": now}}
+        )
+
+    async def request_cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Flag a job for cancellation; queued jobs are cancelled immediately"""
+        now = datetime.utcnow()
+        await self.db[self.collection_name].update_one(
+            {"_id": ObjectId(job_id), "status": JobStatus.QUEUED.value},
+            {"$set": {"status": JobStatus.CANCELLED.value, "finished_at": now}}
+        )
+        await self.db[self.collection_name].update_one(
+            {"_id": ObjectId(job_id), "status": {"$in": ACTIVE_STATUSES}},
+            {"$set": {"cancel_requested": True, "updated_at": now}}
+        )
+        return await self.get_job(job_id)
+
+    async def heartbeat(self, job_ids: List[str]) -> None:
+        """Mark jobs as still owned by a live process"""
+        await self.db[self.collection_name].update_many(
+            {"_id": {"$in": [ObjectId(job_id) for job_id in job_ids]}, "status": {"$in": ACTIVE_STATUSES}},
+            {"$set": {"heartbeat_at": datetime.utcnow()}}
+        )
+
+    async def fail_stale(self, stale_after: int = JOB_STALE_AFTER) -> int:
+        """Fail queued/running jobs whose process stopped without recording a final status"""
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=stale_after)
+        result = await self.db[self.collection_name].update_many(
+            {
+                "status": {"$in": ACTIVE_STATUSES},
+                "$or": [
+                    {"heartbeat_at": {"$lt": cutoff}},
+                    {"heartbeat_at": {"$exists": False}, "updated_at": {"$lt": cutoff}}
+                ]
+            },
+            {"$set": {
+                "status": JobStatus.FAILED.value,
+                "error": "Interrupted: the worker running this job stopped",
+                "finished_at": now,
+                "updated_at": now
+            }}
+        )
+        return result.modified_count
+
+class JobRunner:
+    """Runs jobs as asyncio tasks with bounded concurrency per process"""
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY, heartbeat_interval: int = JOB_HEARTBEAT_INTERVAL):
+        self.concurrency = concurrency
+        self.heartbeat_interval = heartbeat_interval
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._job_ids: Set[str] = set()
+        self._watcher: Optional[asyncio.Task] = None
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        """Heartbeat this process's jobs and fail those left behind by stopped processes"""
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch(JobService(db)))
+
+    async def _watch(self, service: JobService) -> None:
+        while True:
+            try:
+                # Refresh our own jobs first so a delayed loop never fails them
+                if self._job_ids:
+                    await service.heartbeat(list(self._job_ids))
+                failed = await service.fail_stale()
+                if failed:
+                    logger.warning(f"Marked {failed} interrupted job(s) as failed")
+            except Exception as e:
+                logger.error(f"Job heartbeat failed: {e}")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    def submit(
+        self,
+        db: AsyncIOMotorDatabase,
+        job_id: str,
+        batches: Callable[[], AsyncIterator[Dict[str, Any]]],
+        cleanup: Optional[Callable[[], None]] = None
+    ) -> None:
+        """Schedule a job; batches is called once a worker slot is free"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        task = asyncio.create_task(self._run(JobService(db), job_id, batches, cleanup))
+        self._job_ids.add(job_id)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self,
+        service: JobService,
+        job_id: str,
+        batches: Callable[[], AsyncIterator[Dict[str, Any]]],
+        cleanup: Optional[Callable[[], None]]
+    ) -> None:
+        try:
+            async with self._semaphore:
+                started_at = await service.mark_running(job_id)
+                if started_at is None:
+                    return
+
+                processed = 0
+                status = JobStatus.COMPLETED
+                results = batches()
+                try:
+                    async for result in results:
+                        processed += result["processed"]
+                        elapsed = (datetime.utcnow() - started_at).total_seconds()
+                        rate = round(processed / elapsed, 1) if elapsed > 0 else 0.0
+                        if await service.record_progress(job_id, result, rate):
+                            status = JobStatus.CANCELLED
+                            break
+                finally:
+                    # Release the generator's pending batches and cursors on cancel
+                    await results.aclose()
+                await service.finish(job_id, status)
+        except asyncio.CancelledError:
+            await asyncio.shield(service.finish(job_id, JobStatus.FAILED, "Interrupted by shutdown"))
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            await service.finish(job_id, JobStatus.FAILED, str(e))
+        finally:
+            self._job_ids.discard(job_id)
+            if cleanup:
+                cleanup()
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs and wait for them to record their state"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+job_runner = JobRunner()
@@ -1,19 +1,24 @@
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict
 from datetime import datetime
 from pydantic_core import core_schema
 from pydantic import GetCoreSchemaHandler
 from enum import Enum
 from bson import ObjectId
+from app.config import MAX_BATCH_GET_IDS
 
 class PyObjectId(str):
     @classmethod
     def __get_pydantic_core_schema__(
             cls, _source_type, handler: GetCoreSchemaHandler
     ) -> core_schema.CoreSchema:
-        return core_schema.no_info_after_validator_function(
-            cls.validate,
-            schema=core_schema.str_schema()
+        # Stored documents carry ObjectId instances; JSON input carries strings
+        return core_schema.json_or_python_schema(
+            json_schema=core_schema.no_info_after_validator_function(cls.validate, core_schema.str_schema()),
+            python_schema=core_schema.no_info_after_validator_function(
+                cls.validate,
+                core_schema.union_schema([core_schema.is_instance_schema(ObjectId), core_schema.str_schema()])
+            )
         )
 
     @classmethod
@@ -97,15 +102,28 @@ class Question(QuestionBase):
         json_encoders = {ObjectId: str}
 
 class QuestionListResponse(BaseModel):
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
     items: List[Question]
+    next_cursor: Optional[str] = None
+
+class QuestionFieldsListResponse(BaseModel):
+    """A page of questions trimmed to the fields the caller selected"""
+    total: Optional[int]
+    page: int
+    page_size: int
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
 
 class ErrorResponse(BaseModel):
     detail: str
     error_code: str
 
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_GET_IDS)
+    fields: Optional[List[str]] = None
+
 class SearchQueryRequest(BaseModel):
     text: Optional[str] = None
     category_id: Optional[str] = None
@@ -122,3 +140,13 @@ class StatisticsResponse(BaseModel):
     by_difficulty: Dict[str, int]
     by_category: Dict[str, int]
     by_source: Dict[str, int]
+
+class ExamAssemblyRequest(BaseModel):
+    total_questions: int = Field(..., ge=1, le=200)
+    difficulty: Dict[DifficultyLevel, int] = {}
+    category_ids: Optional[List[str]] = None
+    source_ids: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+    max_per_tag: Optional[int] = Field(default=None, ge=1)
+    max_total_time_seconds: Optional[int] = Field(default=None, ge=1)
+    exclude_ids: Optional[List[str]] = []
@@ -1,36 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Query, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from bson import ObjectId
+from app.config import MAX_EXPORT_PARTITIONS
 from app.models import QuestionCreate
+from app.jobs import JobService, JobStatus, JobType, job_runner
 from app.services.bulk_service import BulkService
-import json
+from app.utils import ProjectionHelper
+from app.streaming import (
+    StreamFormatError,
+    gzip_chunks,
+    hash_upload,
+    iter_json_array_rows,
+    iter_ndjson_rows,
+    spool_upload,
+)
 
 router = APIRouter()
 
-async def get_bulk_service(request) -> BulkService:
+async def get_bulk_service(request: Request) -> BulkService:
     db = request.app.db
     return BulkService(db)
 
 @router.post("/import/json", status_code=status.HTTP_201_CREATED)
 async def bulk_import_json(
     file: UploadFile = File(...),
+    resume: bool = Query(True),
+    on_duplicate: str = Query("skip", pattern="^(skip|upsert)$"),
     service: BulkService = Depends(get_bulk_service)
 ):
-    """Bulk import questions from JSON file"""
+    """Bulk import questions from a JSON array file, parsed incrementally"""
+    return await _import_stream(service, file, "json", iter_json_array_rows, resume, on_duplicate)
+
+@router.post("/import/ndjson", status_code=status.HTTP_201_CREATED)
+async def bulk_import_ndjson(
+    file: UploadFile = File(...),
+    resume: bool = Query(True),
+    on_duplicate: str = Query("skip", pattern="^(skip|upsert)$"),
+    service: BulkService = Depends(get_bulk_service)
+):
+    """Bulk import questions from a newline-delimited JSON file"""
+    return await _import_stream(service, file, "ndjson", iter_ndjson_rows, resume, on_duplicate)
+
+async def _import_stream(
+    service: BulkService,
+    file: UploadFile,
+    file_format: str,
+    parser,
+    resume: bool,
+    on_duplicate: str
+) -> dict:
+    """Feed parsed upload rows to the service in bounded batches, resuming a retried upload"""
     try:
-        contents = await file.read()
-        data = json.loads(contents)
-        
-        if not isinstance(data, list):
-            raise HTTPException(status_code=400, detail="Expected JSON array")
-        
-        result = await service.bulk_import(data)
+        upload_hash = await hash_upload(file)
+        result = await service.bulk_import_stream(
+            parser(file), upload_hash, file_format, resume, on_duplicate
+        )
         return {
             "total_imported": result["imported"],
             "total_failed": result["failed"],
+            "total_duplicates": result["duplicates"],
             "errors": result["errors"]
         }
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON format")
+    except StreamFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -38,18 +71,30 @@ async def bulk_import_json(
 async def bulk_export_json(
     category_id: str = None,
     source_id: str = None,
+    export_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    use_gzip: bool = Query(False, alias="gzip"),
+    partitions: int = Query(1, ge=1, le=MAX_EXPORT_PARTITIONS),
+    fields: Optional[str] = None,
     service: BulkService = Depends(get_bulk_service)
 ):
-    """Export questions to JSON"""
+    """Export questions as a streamed JSON document or NDJSON"""
     try:
+        projection = ProjectionHelper.build_projection(ProjectionHelper.parse_fields(fields))
         filters = {}
         if category_id:
             filters["category_id"] = category_id
         if source_id:
             filters["source_id"] = source_id
         
-        data = await service.bulk_export(filters)
-        return {"data": data, "count": len(data)}
+        body = service.stream_export(filters, export_format, partitions, projection)
+        headers = {}
+        if use_gzip:
+            body = gzip_chunks(body)
+            headers["Content-Encoding"] = "gzip"
+        media_type = "application/x-ndjson" if export_format == "ndjson" else "application/json"
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
@@ -83,3 +128,129 @@ async def bulk_delete(
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
+
+async def get_job_service(request: Request) -> JobService:
+    db = request.app.db
+    return JobService(db)
+
+@router.post("/jobs/import/json", status_code=status.HTTP_202_ACCEPTED)
+async def submit_import_json_job(
+    file: UploadFile = File(...),
+    resume: bool = Query(True),
+    on_duplicate: str = Query("skip", pattern="^(skip|upsert)$"),
+    service: JobService = Depends(get_job_service)
+):
+    """Queue a background import of a JSON array file"""
+    return await _submit_import_job(service, file, "json", iter_json_array_rows, resume, on_duplicate)
+
+@router.post("/jobs/import/ndjson", status_code=status.HTTP_202_ACCEPTED)
+async def submit_import_ndjson_job(
+    file: UploadFile = File(...),
+    resume: bool = Query(True),
+    on_duplicate: str = Query("skip", pattern="^(skip|upsert)$"),
+    service: JobService = Depends(get_job_service)
+):
+    """Queue a background import of a newline-delimited JSON file"""
+    return await _submit_import_job(service, file, "ndjson", iter_ndjson_rows, resume, on_duplicate)
+
+async def _submit_import_job(
+    service: JobService,
+    file: UploadFile,
+    file_format: str,
+    parser,
+    resume: bool,
+    on_duplicate: str
+) -> dict:
+    upload = None
+    try:
+        upload = await spool_upload(file)
+        job_id = await service.create_job(
+            JobType.IMPORT,
+            params={
+                "format": file_format,
+                "filename": file.filename,
+                "upload_hash": upload.sha256,
+                "on_duplicate": on_duplicate
+            }
+        )
+        bulk_service = BulkService(service.db)
+        job_runner.submit(
+            service.db,
+            job_id,
+            lambda: bulk_service.import_batches(
+                parser(upload), upload.sha256, file_format, resume, on_duplicate
+            ),
+            cleanup=upload.remove
+        )
+        return {"job_id": job_id, "status": JobStatus.QUEUED.value}
+    except Exception as e:
+        # The runner owns the spooled file only once the job is submitted
+        if upload is not None:
+            upload.remove()
+        raise HTTPException(status_code=500, detail="Failed to submit job")
+
+@router.post("/jobs/update", status_code=status.HTTP_202_ACCEPTED)
+async def submit_update_job(
+    updates: List[dict],
+    service: JobService = Depends(get_job_service)
+):
+    """Queue a background bulk update"""
+    try:
+        job_id = await service.create_job(JobType.UPDATE, total=len(updates))
+        bulk_service = BulkService(service.db)
+        job_runner.submit(service.db, job_id, lambda: bulk_service.update_batches(updates))
+        return {"job_id": job_id, "status": JobStatus.QUEUED.value}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to submit job")
+
+@router.post("/jobs/delete", status_code=status.HTTP_202_ACCEPTED)
+async def submit_delete_job(
+    question_ids: List[str],
+    service: JobService = Depends(get_job_service)
+):
+    """Queue a background bulk delete"""
+    try:
+        job_id = await service.create_job(JobType.DELETE, total=len(question_ids))
+        bulk_service = BulkService(service.db)
+        job_runner.submit(service.db, job_id, lambda: bulk_service.delete_batches(question_ids))
+        return {"job_id": job_id, "status": JobStatus.QUEUED.value}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to submit job")
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    service: JobService = Depends(get_job_service)
+):
+    """Get progress, throughput and errors of a background job"""
+    try:
+        if not ObjectId.is_valid(job_id):
+            raise HTTPException(status_code=400, detail="Invalid job ID")
+        
+        job = await service.get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(
+    job_id: str,
+    service: JobService = Depends(get_job_service)
+):
+    """Cancel a background job; a running job stops after its current chunk"""
+    try:
+        if not ObjectId.is_valid(job_id):
+            raise HTTPException(status_code=400, detail="Invalid job ID")
+        
+        job = await service.request_cancel(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error")
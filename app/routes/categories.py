@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
 from typing import List, Optional
 from app.models import Category, CategoryBase
 from app.services.category_service import CategoryService
+from app.utils import ETagHelper
 from bson import ObjectId
 
 router = APIRouter()
 
-async def get_category_service(request) -> CategoryService:
+async def get_category_service(request: Request) -> CategoryService:
     db = request.app.db
     return CategoryService(db)
 
@@ -24,27 +25,47 @@ async def create_category(
 
 @router.get("/", response_model=List[Category])
 async def list_categories(
-    service: CategoryService = Depends(get_category_service)
+    response: Response,
+    service: CategoryService = Depends(get_category_service),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """List all categories"""
+    """List all categories; If-None-Match with the current list ETag returns 304"""
     try:
-        return await service.list_categories()
+        if if_none_match:
+            etag = await service.list_etag()
+            if ETagHelper.matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
+        categories = await service.list_categories()
+        latest = max((item.updated_at for item in categories), default=None)
+        response.headers["ETag"] = ETagHelper.list_etag(len(categories), latest)
+        return categories
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/{category_id}", response_model=Category)
 async def get_category(
     category_id: str,
-    service: CategoryService = Depends(get_category_service)
+    response: Response,
+    service: CategoryService = Depends(get_category_service),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """Get a category by ID"""
+    """Get a category by ID; If-None-Match with its current ETag returns 304"""
     try:
         if not ObjectId.is_valid(category_id):
             raise HTTPException(status_code=400, detail="Invalid category ID")
         
+        if if_none_match:
+            etag = await service.get_category_etag(category_id)
+            if etag is None:
+                raise HTTPException(status_code=404, detail="Category not found")
+            if ETagHelper.matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
         category = await service.get_category(category_id)
         if not category:
             raise HTTPException(status_code=404, detail="Category not found")
+        response.headers["ETag"] = ETagHelper.document_etag(category.id, category.updated_at)
         return category
     except HTTPException:
         raise
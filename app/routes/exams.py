@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.models import ExamAssemblyRequest
+from app.services.exam_service import ExamService
+
+router = APIRouter()
+
+async def get_exam_service(request: Request) -> ExamService:
+    db = request.app.db
+    return ExamService(db)
+
+@router.post("/assemble")
+async def assemble_exam(
+    exam_request: ExamAssemblyRequest,
+    service: ExamService = Depends(get_exam_service)
+):
+    """Assemble an exam paper from difficulty quotas, a per-tag cap and a time budget"""
+    try:
+        return await service.assemble(exam_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to assemble exam")
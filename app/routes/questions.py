@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Header
-from typing import List, Optional
-from app.models import Question, QuestionCreate, QuestionUpdate, QuestionListResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, Header
+from typing import List, Optional, Union
+from app.models import (
+    BatchGetRequest, Question, QuestionCreate, QuestionUpdate, QuestionFieldsListResponse, QuestionListResponse
+)
 from app.services.question_service import QuestionService
 from app.validators import QuestionValidator
+from app.cache import question_cache
+from app.config import VALIDATE_RESPONSES
+from app.serialization import FastJSONResponse
+from app.utils import ETagHelper, ProjectionHelper
 from bson import ObjectId
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-async def get_question_service(request) -> QuestionService:
+async def get_question_service(request: Request) -> QuestionService:
     """Dependency injection for QuestionService"""
     db = request.app.db
     return QuestionService(db)
@@ -31,6 +37,8 @@ async def create_question(
         result = await service.create_question(question.dict(), idempotency_key)
         logger.info(f"Created question: {result.id}")
         return result
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.warning(f"Validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -38,36 +46,74 @@ async def create_question(
         logger.error(f"Error creating question: {e}")
         raise HTTPException(status_code=500, detail="Failed to create question")
 
+@router.post("/batch-get")
+async def batch_get_questions(
+    batch: BatchGetRequest,
+    service: QuestionService = Depends(get_question_service)
+):
+    """Get many questions by ID in one call, in request order"""
+    try:
+        return await service.get_questions(batch.ids, batch.fields)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error retrieving questions: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve questions")
+
+@router.get("/cache/stats")
+async def get_question_cache_stats():
+    """Get hit ratio, evictions and memory of the question cache"""
+    return question_cache.stats()
+
 @router.get("/{question_id}", response_model=Question)
 async def get_question(
     question_id: str,
-    service: QuestionService = Depends(get_question_service)
+    service: QuestionService = Depends(get_question_service),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """Get a question by ID"""
+    """Get a question by ID; If-None-Match with its current ETag returns 304"""
     try:
         if not ObjectId.is_valid(question_id):
             raise HTTPException(status_code=400, detail="Invalid question ID format")
         
-        question = await service.get_question(question_id)
-        if not question:
+        if if_none_match:
+            etag = await service.get_question_etag(question_id)
+            if etag is None:
+                raise HTTPException(status_code=404, detail="Question not found")
+            if ETagHelper.matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
+        # The cached body is already serialized by the response model
+        loaded = await service.get_question_payload(question_id)
+        if loaded is None:
             raise HTTPException(status_code=404, detail="Question not found")
-        return question
+        payload, etag = loaded
+        return Response(content=payload, media_type="application/json", headers={"ETag": etag})
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error retrieving question: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve question")
 
-@router.get("/", response_model=QuestionListResponse)
+@router.get("/", response_model=Union[QuestionListResponse, QuestionFieldsListResponse])
 async def list_questions(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     category_id: Optional[str] = None,
     source_id: Optional[str] = None,
     difficulty: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: str = Query("true", pattern="^(true|false|estimated)$"),
+    fields: Optional[str] = None,
     service: QuestionService = Depends(get_question_service)
 ):
-    """List questions with pagination and filters"""
+    """List questions with pagination and filters; fields=a,b trims each item
+    
+    Unless VALIDATE_RESPONSES is set (the default in DEBUG), stored documents
+    are encoded directly with orjson instead of through the response model.
+    """
     try:
         filters = {}
         if category_id:
@@ -80,10 +126,17 @@ async def list_questions(
                 raise HTTPException(status_code=400, detail="Invalid difficulty level")
             filters["metadata.difficulty"] = difficulty
         
-        result = await service.list_questions(page, page_size, filters)
+        result = await service.list_questions(
+            page, page_size, filters, cursor, include_total, ProjectionHelper.parse_fields(fields),
+            validate=VALIDATE_RESPONSES
+        )
+        if not VALIDATE_RESPONSES:
+            return FastJSONResponse(result)
         return result
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing questions: {e}")
         raise HTTPException(status_code=500, detail="Failed to list questions")
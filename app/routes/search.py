@@ -1,39 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import Optional, List
 from app.services.search_service import SearchService
-from app.utils import SearchFilters
+from app.utils import ProjectionHelper, SearchFilters
+from app.cache import search_cache
+from app.index_advisor import index_advisor
 
 router = APIRouter()
 
-async def get_search_service(request) -> SearchService:
+async def get_search_service(request: Request) -> SearchService:
     db = request.app.db
     return SearchService(db)
 
 @router.get("/text-search")
 async def text_search(
     q: str = Query(..., min_length=1),
+    mode: str = Query("text", pattern="^(text|substring)$"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: str = Query("true", pattern="^(true|false|estimated)$"),
+    fuzzy: bool = False,
+    fields: Optional[str] = None,
     service: SearchService = Depends(get_search_service)
 ):
-    """Full-text search across questions"""
+    """Full-text search across questions, ranked by relevance"""
     try:
-        result = await service.text_search(q, page, page_size)
+        result = await service.text_search(
+            q, page, page_size, mode, cursor, include_total, fuzzy, ProjectionHelper.parse_fields(fields)
+        )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Search failed")
 
 @router.get("/advanced")
 async def advanced_search(
     text: Optional[str] = None,
+    text_mode: str = Query("text", pattern="^(text|substring)$"),
+    fuzzy: bool = False,
     category_id: Optional[str] = None,
     source_id: Optional[str] = None,
     difficulty: Optional[str] = None,
     tags: Optional[List[str]] = Query(None),
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    facets: Optional[List[str]] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: str = Query("true", pattern="^(true|false|estimated)$"),
+    fields: Optional[str] = None,
     service: SearchService = Depends(get_search_service)
 ):
     """Advanced search with multiple filters"""
@@ -41,7 +58,7 @@ async def advanced_search(
         filters = {}
         
         if text:
-            filters.update(SearchFilters.build_text_search(text))
+            filters.update(service.text_filters(text, text_mode, fuzzy))
         if category_id:
             filters["category_id"] = category_id
         if source_id:
@@ -53,7 +70,9 @@ async def advanced_search(
         if start_date and end_date:
             filters.update(SearchFilters.build_date_range_filter(start_date, end_date))
         
-        result = await service.advanced_search(filters, page, page_size)
+        result = await service.advanced_search(
+            filters, page, page_size, cursor, include_total, facets, ProjectionHelper.parse_fields(fields)
+        )
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -65,12 +84,19 @@ async def get_by_difficulty(
     difficulty: str = Query(...),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: str = Query("true", pattern="^(true|false|estimated)$"),
+    fields: Optional[str] = None,
     service: SearchService = Depends(get_search_service)
 ):
     """Get questions filtered by difficulty"""
     try:
-        result = await service.search_by_difficulty(difficulty, page, page_size)
+        result = await service.search_by_difficulty(
+            difficulty, page, page_size, cursor, include_total, ProjectionHelper.parse_fields(fields)
+        )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Search failed")
 
@@ -84,3 +110,31 @@ async def get_statistics(
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to get statistics")
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss counters for the search result cache"""
+    return search_cache.stats()
+
+@router.get("/index-advisor")
+async def get_index_advice(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Report the hottest query shapes, explain() slow ones and propose compound indexes"""
+    try:
+        return await index_advisor.report(request.app.db, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to build index report")
+
+@router.post("/index-advisor/apply")
+async def apply_index_advice(
+    request: Request,
+    min_count: int = Query(100, ge=1)
+):
+    """Create the proposed indexes for shapes seen at least min_count times"""
+    try:
+        created = await index_advisor.apply(request.app.db, min_count)
+        return {"created": created}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to create indexes")
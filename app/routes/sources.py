@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
 from typing import List, Optional
 from app.models import Source, SourceBase
 from app.services.source_service import SourceService
+from app.utils import ETagHelper
 from bson import ObjectId
 
 router = APIRouter()
 
-async def get_source_service(request) -> SourceService:
+async def get_source_service(request: Request) -> SourceService:
     db = request.app.db
     return SourceService(db)
 
@@ -24,27 +25,47 @@ async def create_source(
 
 @router.get("/", response_model=List[Source])
 async def list_sources(
-    service: SourceService = Depends(get_source_service)
+    response: Response,
+    service: SourceService = Depends(get_source_service),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """List all sources"""
+    """List all sources; If-None-Match with the current list ETag returns 304"""
     try:
-        return await service.list_sources()
+        if if_none_match:
+            etag = await service.list_etag()
+            if ETagHelper.matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
+        sources = await service.list_sources()
+        latest = max((item.updated_at for item in sources), default=None)
+        response.headers["ETag"] = ETagHelper.list_etag(len(sources), latest)
+        return sources
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/{source_id}", response_model=Source)
 async def get_source(
     source_id: str,
-    service: SourceService = Depends(get_source_service)
+    response: Response,
+    service: SourceService = Depends(get_source_service),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """Get a source by ID"""
+    """Get a source by ID; If-None-Match with its current ETag returns 304"""
     try:
         if not ObjectId.is_valid(source_id):
             raise HTTPException(status_code=400, detail="Invalid source ID")
         
+        if if_none_match:
+            etag = await service.get_source_etag(source_id)
+            if etag is None:
+                raise HTTPException(status_code=404, detail="Source not found")
+            if ETagHelper.matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
         source = await service.get_source(source_id)
         if not source:
             raise HTTPException(status_code=404, detail="Source not found")
+        response.headers["ETag"] = ETagHelper.document_etag(source.id, source.updated_at)
         return source
     except HTTPException:
         raise
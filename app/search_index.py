@@ -0,0 +1,304 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from array import array
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+from app.config import BM25_K1, BM25_B
+import heapq
+import logging
+import math
+import re
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Question fields whose $set changes what the index holds for a question
+INDEXED_FIELDS = ("text", "explanation", "metadata")
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold()
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized word tokens"""
+    return TOKEN_PATTERN.findall(normalize(text))
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def question_fields(question: Dict[str, Any]) -> List[str]:
+    """The normalized text, explanation and tags of a question"""
+    metadata = question.get("metadata") or {}
+    parts = [question.get("text"), question.get("explanation"), *(metadata.get("tags") or [])]
+    return [normalize(str(part)) for part in parts if part]
+
+def question_terms(question: Dict[str, Any]) -> List[str]:
+    """Tokens of a question's text, explanation and tags"""
+    return TOKEN_PATTERN.findall(" ".join(question_fields(question)))
+
+def max_edits(term: str) -> int:
+    """Typos tolerated in a query term of this length"""
+    return 0 if len(term) <= 2 else 1 if len(term) <= 5 else 2
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or limit + 1 once it is known to exceed limit"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+class SearchIndex:
+    """In-memory BM25 and trigram index over the questions collection
+
+    Documents are numbered with ordinals; each term maps to parallel arrays of
+    ordinals and term frequencies, and each character trigram of a document's
+    normalized fields to an array of ordinals. Vocabulary terms are also
+    indexed by trigram so misspelled query terms can be expanded. Removed
+    documents leave a tombstone until enough accumulate to rebuild the postings.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.ready = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: List[Optional[str]] = []
+        self._ordinals: Dict[str, int] = {}
+        self._lengths = array("I")
+        self._terms: List[Optional[Tuple[str, ...]]] = []
+        self._postings: Dict[str, array] = {}
+        self._frequencies: Dict[str, array] = {}
+        self._document_frequency: Dict[str, int] = {}
+        self._texts: List[Optional[str]] = []
+        self._gram_postings: Dict[str, array] = {}
+        self._term_grams: Dict[str, set] = {}
+        self._live = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    async def load(self, db: AsyncIOMotorDatabase) -> None:
+        """Build the index from every stored question"""
+        self.ready = False
+        self._reset()
+        cursor = db["questions"].find({}, {"text": 1, "explanation": 1, "metadata.tags": 1})
+        async for question in cursor:
+            self._add(question)
+        self.ready = True
+        logger.info(f"Search index loaded with {self._live} questions")
+
+    async def refresh(self, db: AsyncIOMotorDatabase, object_ids: List[Any]) -> None:
+        """Re-read and re-index the given questions after an update"""
+        if not self.ready or not object_ids:
+            return
+        cursor = db["questions"].find(
+            {"_id": {"$in": object_ids}}, {"text": 1, "explanation": 1, "metadata.tags": 1}
+        )
+        async for question in cursor:
+            self._add(question)
+
+    def index(self, question: Dict[str, Any]) -> None:
+        """Add or replace one question"""
+        if self.ready:
+            self._add(question)
+
+    def remove(self, question_id: str) -> None:
+        """Drop one question"""
+        if self.ready:
+            self._remove(str(question_id))
+
+    def search(self, query: str, limit: int) -> Tuple[int, List[Tuple[str, float]]]:
+        """Return the number of matches and the top (question_id, score) pairs"""
+        return self._score({term: 1.0 for term in tokenize(query)}, limit)
+
+    def fuzzy_search(self, query: str, limit: int) -> Tuple[int, List[Tuple[str, float]]]:
+        """BM25 search where each query term also matches terms a few typos away
+
+        Candidate terms come from trigram overlap with the vocabulary and are
+        verified by edit distance; a term counts less the further it is.
+        """
+        weights: Dict[str, float] = {}
+        for token in set(tokenize(query)):
+            for term, distance in self._similar_terms(token):
+                weights[term] = max(weights.get(term, 0.0), 1 / (1 + distance))
+        return self._score(weights, limit)
+
+    def substring_search(self, query: str, limit: int) -> Tuple[int, List[Tuple[str, float]]]:
+        """Questions whose text, explanation or a tag contains the query literally
+
+        Candidates must contain every trigram of the query and are then
+        verified; more occurrences rank higher.
+        """
+        needle = normalize(query)
+        grams = trigrams(needle)
+        if grams:
+            postings = sorted((self._gram_postings.get(gram) for gram in grams), key=lambda p: len(p or ()))
+            if postings[0] is None:
+                return 0, []
+            candidates = set(postings[0])
+            for ordinals in postings[1:]:
+                candidates.intersection_update(ordinals)
+                if not candidates:
+                    return 0, []
+        else:
+            candidates = range(len(self._ids))
+
+        scores = {}
+        for ordinal in candidates:
+            text = self._texts[ordinal]
+            if text is not None and needle in text:
+                scores[ordinal] = float(text.count(needle))
+        return self._top(scores, limit)
+
+    def _similar_terms(self, token: str) -> List[Tuple[str, int]]:
+        """Vocabulary terms within max_edits(token) of token, with their distance"""
+        limit = max_edits(token)
+        if limit == 0:
+            return [(token, 0)] if token in self._postings else []
+
+        grams = trigrams(f"${token}$")
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._term_grams.get(gram, ()))
+        # Each edit destroys at most three trigrams
+        threshold = max(1, len(grams) - 3 * limit)
+        similar = []
+        for term, count in shared.items():
+            if count >= threshold and abs(len(term) - len(token)) <= limit:
+                distance = edit_distance(token, term, limit)
+                if distance <= limit:
+                    similar.append((term, distance))
+        return similar
+
+    def _score(self, weights: Dict[str, float], limit: int) -> Tuple[int, List[Tuple[str, float]]]:
+        """BM25 over the weighted query terms"""
+        scores: Dict[int, float] = {}
+        if self._live:
+            average_length = self._total_length / self._live or 1
+            for term, weight in weights.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                frequency = self._document_frequency[term]
+                idf = weight * math.log(1 + (self._live - frequency + 0.5) / (frequency + 0.5))
+                for ordinal, tf in zip(postings, self._frequencies[term]):
+                    if self._ids[ordinal] is None:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[ordinal] / average_length)
+                    scores[ordinal] = scores.get(ordinal, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return self._top(scores, limit)
+
+    def _top(self, scores: Dict[int, float], limit: int) -> Tuple[int, List[Tuple[str, float]]]:
+        # Earlier ordinals win ties so paging is stable
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return len(scores), [(self._ids[ordinal], score) for ordinal, score in top]
+
+    def _add(self, question: Dict[str, Any]) -> None:
+        question_id = str(question["_id"])
+        self._remove(question_id)
+
+        fields = question_fields(question)
+        terms = TOKEN_PATTERN.findall(" ".join(fields))
+        counts = Counter(terms)
+        ordinal = len(self._ids)
+        for term, tf in counts.items():
+            if term not in self._postings:
+                self._postings[term] = array("I")
+                self._frequencies[term] = array("I")
+                self._document_frequency[term] = 0
+                for gram in trigrams(f"${term}$"):
+                    self._term_grams.setdefault(gram, set()).add(term)
+            self._postings[term].append(ordinal)
+            self._frequencies[term].append(tf)
+            self._document_frequency[term] += 1
+
+        # Fields are kept apart so a substring cannot span two of them
+        text = "\n".join(fields)
+        for gram in trigrams(text):
+            if gram not in self._gram_postings:
+                self._gram_postings[gram] = array("I")
+            self._gram_postings[gram].append(ordinal)
+
+        self._ids.append(question_id)
+        self._ordinals[question_id] = ordinal
+        self._lengths.append(len(terms))
+        self._terms.append(tuple(counts))
+        self._texts.append(text)
+        self._live += 1
+        self._total_length += len(terms)
+
+    def _remove(self, question_id: str) -> None:
+        ordinal = self._ordinals.pop(question_id, None)
+        if ordinal is None:
+            return
+        for term in self._terms[ordinal]:
+            self._document_frequency[term] -= 1
+            if not self._document_frequency[term]:
+                del self._postings[term]
+                del self._frequencies[term]
+                del self._document_frequency[term]
+                for gram in trigrams(f"${term}$"):
+                    self._term_grams[gram].discard(term)
+                    if not self._term_grams[gram]:
+                        del self._term_grams[gram]
+
+        self._ids[ordinal] = None
+        self._terms[ordinal] = None
+        self._texts[ordinal] = None
+        self._live -= 1
+        self._total_length -= self._lengths[ordinal]
+
+        if len(self._ids) - self._live > max(self._live, 1000):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Renumber live documents and drop tombstones from the postings"""
+        remap = {}
+        ids = []
+        lengths = array("I")
+        terms = []
+        texts = []
+        for ordinal, question_id in enumerate(self._ids):
+            if question_id is not None:
+                remap[ordinal] = len(ids)
+                ids.append(question_id)
+                lengths.append(self._lengths[ordinal])
+                terms.append(self._terms[ordinal])
+                texts.append(self._texts[ordinal])
+
+        for term, postings in self._postings.items():
+            kept = array("I")
+            kept_frequencies = array("I")
+            for ordinal, tf in zip(postings, self._frequencies[term]):
+                if ordinal in remap:
+                    kept.append(remap[ordinal])
+                    kept_frequencies.append(tf)
+            self._postings[term] = kept
+            self._frequencies[term] = kept_frequencies
+
+        for gram, postings in list(self._gram_postings.items()):
+            kept = array("I", (remap[ordinal] for ordinal in postings if ordinal in remap))
+            if kept:
+                self._gram_postings[gram] = kept
+            else:
+                del self._gram_postings[gram]
+
+        self._ids = ids
+        self._ordinals = {question_id: ordinal for ordinal, question_id in enumerate(ids)}
+        self._lengths = lengths
+        self._terms = terms
+        self._texts = texts
+
+search_index = SearchIndex()
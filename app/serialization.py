@@ -0,0 +1,24 @@
+from fastapi.responses import JSONResponse
+from bson import ObjectId
+from typing import Any
+import orjson
+
+def orjson_default(value: Any) -> Any:
+    """orjson fallback for the BSON types it does not encode natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Encode stored documents as JSON; datetimes and enums are handled by orjson itself"""
+    return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered straight from Motor documents, skipping jsonable_encoder
+
+    Returned from a route it also bypasses response_model validation, so the
+    content must already have the documented shape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
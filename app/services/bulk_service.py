@@ -1,107 +1,658 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+from collections import deque
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+import asyncio
+import json
+from app.config import (
+    BULK_BATCH_SIZE,
+    BULK_WRITE_BATCH_SIZE,
+    EXPORT_BATCH_SIZE,
+    EXPORT_SAMPLES_PER_PARTITION,
+    STREAM_CHUNK_SIZE,
+)
 from app.models import Question, QuestionCreate
 from app.events import EventService, EventType
+from app.idempotency import ImportCheckpointService
+from app.cache import question_cache, search_cache
+from app.search_index import INDEXED_FIELDS, search_index
+from app.statistics import STAT_FIELDS, STAT_PROJECTION, StatisticsService
+from app.streaming import InvalidRow, StreamFormatError, json_default
+from app.utils import FINGERPRINT_FIELDS, ProjectionHelper, apply_set, question_fingerprint
+from app.validators import validation_pool
+
+def _is_fingerprint_conflict(write_error: Dict[str, Any]) -> bool:
+    return write_error.get("code") == 11000 and "fingerprint" in (write_error.get("keyPattern") or {})
+
+async def _merge_streams(sources: List[AsyncIterator[Any]]) -> AsyncIterator[Any]:
+    """Interleave several async iterators, running them concurrently
+    
+    A bounded queue keeps at most a couple of items per source in memory.
+    Sources are async generators; each is closed when its pump stops.
+    """
+    queue = asyncio.Queue(maxsize=2 * len(sources))
+    finished = object()
+    
+    async def pump(source):
+        try:
+            async for item in source:
+                await queue.put(item)
+            last = finished
+        except Exception as e:
+            last = e
+        finally:
+            # Also runs on cancellation, which must not wait on the undrained queue
+            await source.aclose()
+        await queue.put(last)
+    
+    tasks = [asyncio.create_task(pump(source)) for source in sources]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is finished:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 class BulkService:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.collection_name = "questions"
         self.event_service = EventService(db)
+        self.stats_service = StatisticsService(db)
+        self.checkpoint_service = ImportCheckpointService(db)
+    
+    async def bulk_import(
+        self,
+        questions_data: List[Dict[str, Any]],
+        on_duplicate: str = "skip"
+    ) -> Dict[str, Any]:
+        """Bulk import questions in batches of BULK_BATCH_SIZE"""
+        async def rows():
+            for question_data in questions_data:
+                yield question_data
+        
+        return await self.bulk_import_stream(rows(), on_duplicate=on_duplicate)
+    
+    async def bulk_import_stream(
+        self,
+        rows: AsyncIterator[Any],
+        upload_hash: Optional[str] = None,
+        file_format: str = "json",
+        resume: bool = True,
+        on_duplicate: str = "skip"
+    ) -> Dict[str, Any]:
+        """Bulk import rows from an async iterator, holding a bounded number of batches in memory"""
+        totals = await self._collect(
+            self.import_batches(rows, upload_hash, file_format, resume, on_duplicate)
+        )
+        return {
+            "imported": totals["succeeded"],
+            "failed": totals["failed"],
+            "duplicates": totals["duplicates"],
+            "errors": totals["errors"]
+        }
     
-    async def bulk_import(self, questions_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Bulk import questions"""
-        imported = 0
-        failed = 0
+    async def import_batches(
+        self,
+        rows: AsyncIterator[Any],
+        upload_hash: Optional[str] = None,
+        file_format: str = "json",
+        resume: bool = True,
+        on_duplicate: str = "skip"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Import rows BULK_BATCH_SIZE at a time, yielding each batch's result
+        
+        Up to VALIDATION_WORKERS batches are validated ahead of the one being
+        inserted, so validation runs on several cores while inserts stay in order.
+        With an upload_hash, progress is checkpointed after every batch and a
+        retry of an unfinished upload with the same on_duplicate skips the rows
+        already committed. The checkpoint is dropped once the upload completes.
+        """
+        checkpoint = None
+        offset = 0
+        if upload_hash:
+            if not resume:
+                await self.checkpoint_service.reset(upload_hash, file_format, on_duplicate)
+            checkpoint = await self.checkpoint_service.start(upload_hash, file_format, on_duplicate)
+            offset = checkpoint["next_row"]
+            if offset:
+                yield {
+                    "processed": offset,
+                    "succeeded": checkpoint["imported"],
+                    "failed": checkpoint["failed"],
+                    "duplicates": checkpoint["duplicates"],
+                    "errors": checkpoint["errors"]
+                }
+        
+        resume_from = offset
+        pending = deque()
+        batch = []
+        seen = 0
+        try:
+            async for row in rows:
+                seen += 1
+                if seen <= resume_from:
+                    continue
+                batch.append(row)
+                if len(batch) >= BULK_BATCH_SIZE:
+                    pending.append(self._start_validation(batch, offset))
+                    offset += len(batch)
+                    batch = []
+                    if len(pending) > max(validation_pool.max_workers, 1):
+                        yield await self._commit_batch(checkpoint, on_duplicate, *pending.popleft())
+        except StreamFormatError as e:
+            # Nothing committed yet: let the caller reject the upload outright
+            if not pending and offset == 0 and not batch:
+                raise
+            pending.append(self._start_validation(batch, offset, trailing_error=str(e)))
+            while pending:
+                yield await self._commit_batch(checkpoint, on_duplicate, *pending.popleft())
+        else:
+            if batch:
+                pending.append(self._start_validation(batch, offset))
+            while pending:
+                yield await self._commit_batch(checkpoint, on_duplicate, *pending.popleft())
+        
+        if checkpoint:
+            await self.checkpoint_service.complete(checkpoint["_id"])
+    
+    async def update_batches(self, updates: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """Apply updates BULK_WRITE_BATCH_SIZE at a time, yielding each batch's result"""
+        for start in range(0, len(updates), BULK_WRITE_BATCH_SIZE):
+            batch = updates[start:start + BULK_WRITE_BATCH_SIZE]
+            result = await self._update_batch(batch, start)
+            yield {
+                "processed": len(batch),
+                "succeeded": result["updated"],
+                "failed": result["failed"],
+                "errors": result["errors"]
+            }
+    
+    async def delete_batches(self, question_ids: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Delete ids BULK_WRITE_BATCH_SIZE at a time, yielding each batch's result"""
+        for start in range(0, len(question_ids), BULK_WRITE_BATCH_SIZE):
+            batch = question_ids[start:start + BULK_WRITE_BATCH_SIZE]
+            result = await self.bulk_delete(batch)
+            yield {
+                "processed": len(batch),
+                "succeeded": result["deleted"],
+                "failed": result["failed"],
+                "errors": []
+            }
+    
+    def _start_validation(
+        self,
+        batch: List[Any],
+        offset: int,
+        trailing_error: Optional[str] = None
+    ) -> Tuple[int, int, List[Dict[str, Any]], asyncio.Future]:
+        """Schedule validation of a batch; unparseable rows are failed up front"""
+        candidates = []
         errors = []
+        for idx, row in enumerate(batch, start=offset):
+            if isinstance(row, InvalidRow):
+                errors.append({"row": idx, "error": row.error})
+            else:
+                candidates.append((idx, row))
+        if trailing_error:
+            errors.append({"row": offset + len(batch), "error": trailing_error})
+        return offset, len(batch), errors, asyncio.ensure_future(validation_pool.validate(candidates))
+    
+    async def _commit_batch(
+        self,
+        checkpoint: Optional[Dict[str, Any]],
+        on_duplicate: str,
+        offset: int,
+        size: int,
+        errors: List[Dict[str, Any]],
+        validation: asyncio.Future
+    ) -> Dict[str, Any]:
+        """Wait for a batch's validation, insert it and advance the checkpoint"""
+        documents, row_errors = await validation
+        result = await self._insert_batch(documents, on_duplicate)
+        errors = errors + row_errors + result["errors"]
+        errors.sort(key=lambda error: error["row"])
+        if checkpoint:
+            await self.checkpoint_service.advance(
+                checkpoint["_id"], offset + size, result["imported"], len(errors),
+                result["duplicates"], errors
+            )
+        return {
+            "processed": size,
+            "succeeded": result["imported"],
+            "failed": len(errors),
+            "duplicates": result["duplicates"],
+            "errors": errors
+        }
+    
+    @staticmethod
+    async def _collect(batches: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """Sum per-batch results into one"""
+        totals = {"processed": 0, "succeeded": 0, "failed": 0, "duplicates": 0, "errors": []}
+        async for result in batches:
+            totals["processed"] += result["processed"]
+            totals["succeeded"] += result["succeeded"]
+            totals["failed"] += result["failed"]
+            totals["duplicates"] += result.get("duplicates", 0)
+            totals["errors"].extend(result["errors"])
+        return totals
+    
+    async def _insert_batch(
+        self,
+        validated: List[Tuple[int, Dict[str, Any]]],
+        on_duplicate: str = "skip"
+    ) -> Dict[str, Any]:
+        """Insert validated (row, document) pairs with an unordered insert_many and log their events
+        
+        Rows whose fingerprint is already stored, or repeats an earlier row, are
+        counted as duplicates; with on_duplicate="upsert" they overwrite the stored question.
+        """
+        if not validated:
+            return {"imported": 0, "duplicates": 0, "errors": []}
+        
+        errors = []
+        known = await self._existing_fingerprints([doc["fingerprint"] for _, doc in validated])
+        fresh = []
+        duplicates = []
+        for idx, document in validated:
+            if document["fingerprint"] in known:
+                duplicates.append((idx, document))
+            else:
+                known[document["fingerprint"]] = None
+                fresh.append((idx, document))
+        
+        rows = [idx for idx, _ in fresh]
+        documents = [document for _, document in fresh]
+        now = datetime.utcnow()
+        for document in documents:
+            document["created_at"] = now
+            document["updated_at"] = now
+        
+        failed_positions = set()
+        raced = 0
+        try:
+            if documents:
+                await self.db[self.collection_name].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                position = write_error["index"]
+                failed_positions.add(position)
+                if _is_fingerprint_conflict(write_error):
+                    # Stored by a concurrent writer after the lookup above
+                    raced += 1
+                else:
+                    errors.append({"row": rows[position], "error": write_error.get("errmsg", str(e))})
+        except Exception:
+            # An unencodable row aborts insert_many client-side, possibly after
+            # earlier rows were sent; fall back to row-by-row for this batch
+            failed_positions = await self._insert_rows(documents, rows, errors)
+        
+        inserted = [doc for position, doc in enumerate(documents) if position not in failed_positions]
+        inserted_ids = [str(doc["_id"]) for doc in inserted]
+        for doc in inserted:
+            search_index.index(doc)
+        if inserted:
+            search_cache.bump_epoch()
+        await self.stats_service.record(added=inserted)
+        await self.event_service.log_events(EventType.BULK_IMPORT, inserted_ids, "Question")
         
-        for idx, question_data in enumerate(questions_data):
+        if on_duplicate == "upsert" and duplicates:
+            for position, doc in enumerate(documents):
+                if position not in failed_positions:
+                    known[doc["fingerprint"]] = doc["_id"]
+            await self._overwrite_duplicates(duplicates, known, now, errors)
+        
+        return {"imported": len(inserted_ids), "duplicates": len(duplicates) + raced, "errors": errors}
+    
+    async def _existing_fingerprints(self, fingerprints: List[str]) -> Dict[str, Any]:
+        """Map the fingerprints already stored to their question ids"""
+        cursor = self.db[self.collection_name].find(
+            {"fingerprint": {"$in": list(set(fingerprints))}}, {"fingerprint": 1}
+        )
+        return {doc["fingerprint"]: doc["_id"] for doc in await cursor.to_list(length=None)}
+    
+    async def _overwrite_duplicates(
+        self,
+        duplicates: List[Tuple[int, Dict[str, Any]]],
+        known: Dict[str, Any],
+        now: datetime,
+        errors: List[Dict[str, Any]]
+    ) -> None:
+        """Replace the mutable fields of stored questions with their duplicate rows"""
+        operations = []
+        targets = []
+        for idx, document in duplicates:
+            question_id = known.get(document["fingerprint"])
+            if question_id is None:
+                continue
+            changes = {key: value for key, value in document.items() if key != "_id"}
+            changes["updated_at"] = now
+            operations.append(UpdateOne({"_id": question_id}, {"$set": changes}))
+            targets.append((idx, question_id, document))
+        if not operations:
+            return
+        
+        # Only the difficulty can differ between duplicates, but it moves the statistics
+        before = await self._find_by_ids(list({question_id for _, question_id, _ in targets}), STAT_PROJECTION)
+        
+        failed_positions = set()
+        try:
+            await self.db[self.collection_name].bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed_positions.add(write_error["index"])
+                errors.append({"row": targets[write_error["index"]][0], "error": write_error.get("errmsg", str(e))})
+        
+        overwritten = {}
+        for position, (_, question_id, document) in enumerate(targets):
+            if position not in failed_positions:
+                overwritten[question_id] = document
+        search_cache.bump_epoch()
+        question_cache.invalidate(*(question_id for _, question_id, _ in targets))
+        await self.stats_service.record(
+            added=[document for question_id, document in overwritten.items() if question_id in before],
+            removed=[before[question_id] for question_id in overwritten if question_id in before]
+        )
+        await search_index.refresh(self.db, list(overwritten))
+        await self.event_service.insert_events([
+            self.event_service.build_event(EventType.QUESTION_UPDATED, str(question_id), "Question")
+            for question_id in overwritten
+        ])
+    
+    async def _insert_rows(
+        self,
+        documents: List[Dict[str, Any]],
+        rows: List[int],
+        errors: List[Dict[str, Any]]
+    ) -> set:
+        """Insert documents one at a time, skipping those already committed"""
+        committed = await self._existing_ids([doc["_id"] for doc in documents if "_id" in doc])
+        
+        failed_positions = set()
+        for position, doc in enumerate(documents):
+            if doc.get("_id") in committed:
+                continue
             try:
-                question_data["created_at"] = datetime.utcnow()
-                question_data["updated_at"] = datetime.utcnow()
-                
-                result = await self.db[self.collection_name].insert_one(question_data)
-                await self.event_service.log_event(
-                    EventType.BULK_IMPORT,
-                    str(result.inserted_id),
-                    "Question"
-                )
-                imported += 1
+                await self.db[self.collection_name].insert_one(doc)
             except Exception as e:
-                failed += 1
-                errors.append({"row": idx, "error": str(e)})
-        
-        return {"imported": imported, "failed": failed, "errors": errors}
+                failed_positions.add(position)
+                errors.append({"row": rows[position], "error": str(e)})
+        return failed_positions
     
-    async def bulk_export(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Bulk export questions"""
+    async def stream_export(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        export_format: str = "json",
+        partitions: int = 1,
+        projection: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[bytes]:
+        """Serialize matching questions as they come off the cursor
+        
+        "json" produces {"data": [...], "count": n}; "ndjson" one document per line.
+        With partitions > 1 the _id keyspace is split into ranges that are
+        scanned concurrently, so documents arrive in no particular order.
+        projection (see ProjectionHelper) is built by the caller, so a bad field
+        is rejected before the response starts streaming.
+        """
         filters = filters or {}
-        cursor = self.db[self.collection_name].find(filters)
-        questions = await cursor.to_list(length=None)
+        ndjson = export_format == "ndjson"
+        separator = "" if ndjson else ", "
+        
+        ranges = await self._id_ranges(partitions) if partitions > 1 else [{}]
+        sources = [
+            self._encode_range(self._range_query(filters, id_range), ndjson, projection)
+            for id_range in ranges
+        ]
+        pieces = sources[0] if len(sources) == 1 else _merge_streams(sources)
+        
+        if not ndjson:
+            yield b'{"data": ['
+        count = 0
+        try:
+            async for text, pieces_count in pieces:
+                if count and separator:
+                    text = separator + text
+                count += pieces_count
+                yield text.encode()
+        finally:
+            # A client disconnect closes this generator; release the cursors now
+            await pieces.aclose()
+        if not ndjson:
+            yield f'], "count": {count}}}'.encode()
+    
+    async def _encode_range(
+        self,
+        query: Dict[str, Any],
+        ndjson: bool,
+        projection: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[Tuple[str, int]]:
+        """Yield (text, document count) pieces of roughly STREAM_CHUNK_SIZE for one cursor"""
+        cursor = self.db[self.collection_name].find(
+            query, ProjectionHelper.read_projection(projection), batch_size=EXPORT_BATCH_SIZE
+        )
+        pending = []
+        pending_size = 0
+        try:
+            async for question in cursor:
+                encoded = json.dumps(question, default=json_default)
+                if ndjson:
+                    encoded += "\n"
+                pending.append(encoded)
+                pending_size += len(encoded)
+                if pending_size >= STREAM_CHUNK_SIZE:
+                    yield ("" if ndjson else ", ").join(pending), len(pending)
+                    pending = []
+                    pending_size = 0
+        finally:
+            await cursor.close()
+        if pending:
+            yield ("" if ndjson else ", ").join(pending), len(pending)
+    
+    async def _id_ranges(self, partitions: int) -> List[Dict[str, Any]]:
+        """Split the _id keyspace into roughly equal ranges from a random sample
         
-        # Convert ObjectId to string
-        for q in questions:
-            q["_id"] = str(q["_id"])
+        The first range is open-ended below and excludes nothing of another
+        BSON type, so together the ranges cover every document exactly once.
+        """
+        pipeline = [
+            {"$sample": {"size": partitions * EXPORT_SAMPLES_PER_PARTITION}},
+            {"$project": {"_id": 1}}
+        ]
+        sample = await self.db[self.collection_name].aggregate(pipeline).to_list(None)
+        ids = sorted({doc["_id"] for doc in sample if isinstance(doc["_id"], ObjectId)})
+        if len(ids) < partitions:
+            return [{}]
         
-        return questions
+        step = len(ids) / partitions
+        bounds = sorted({ids[int(step * i)] for i in range(1, partitions)})
+        ranges = [{"$not": {"$gte": bounds[0]}}]
+        ranges += [{"$gte": low, "$lt": high} for low, high in zip(bounds, bounds[1:])]
+        ranges.append({"$gte": bounds[-1]})
+        return ranges
+    
+    @staticmethod
+    def _range_query(filters: Dict[str, Any], id_range: Dict[str, Any]) -> Dict[str, Any]:
+        if not id_range:
+            return filters
+        if "_id" in filters:
+            return {"$and": [filters, {"_id": id_range}]}
+        return {**filters, "_id": id_range}
     
     async def bulk_update(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Bulk update questions"""
-        updated = 0
-        failed = 0
+        """Bulk update questions with one bulk_write per batch"""
+        totals = await self._collect(self.update_batches(updates))
+        return {"updated": totals["succeeded"], "failed": totals["failed"], "errors": totals["errors"]}
+    
+    async def _update_batch(self, batch: List[Dict[str, Any]], offset: int) -> Dict[str, Any]:
+        """Apply one batch of updates, merging identical $set payloads into update_many"""
         errors = []
+        rows_by_id = {}
         
-        for idx, update in enumerate(updates):
+        for idx, update in enumerate(batch, start=offset):
             try:
-                question_id = update.pop("id")
-                update["updated_at"] = datetime.utcnow()
-                
-                result = await self.db[self.collection_name].find_one_and_update(
-                    {"_id": ObjectId(question_id)},
-                    {"$set": update},
-                    return_document=True
-                )
-                
-                if result:
-                    await self.event_service.log_event(
-                        EventType.QUESTION_UPDATED,
-                        question_id,
-                        "Question",
-                        changes=update
-                    )
-                    updated += 1
-                else:
-                    failed += 1
-                    errors.append({"row": idx, "error": "Question not found"})
+                question_id = update["id"]
+                changes = {field: value for field, value in update.items() if field != "id"}
+                rows_by_id.setdefault(ObjectId(question_id), []).append((idx, changes))
             except Exception as e:
-                failed += 1
                 errors.append({"row": idx, "error": str(e)})
         
-        return {"updated": updated, "failed": failed, "errors": errors}
+        # Keys may be dotted paths (e.g. "metadata.difficulty"); match on the root field
+        def touches(update: Dict[str, Any], fields: tuple) -> bool:
+            return any(field.split(".", 1)[0] in fields for field in update)
+        
+        def changes_content(update: Dict[str, Any]) -> bool:
+            return touches(update, FINGERPRINT_FIELDS)
+        
+        def moves_stats(update: Dict[str, Any]) -> bool:
+            return touches(update, STAT_FIELDS)
+        
+        # Fetch the fingerprinted and counted fields only when some row changes them
+        updates = [update for rows in rows_by_id.values() for _, update in rows]
+        refingerprint = any(changes_content(update) for update in updates)
+        restat = any(moves_stats(update) for update in updates)
+        projection = {"_id": 1}
+        if refingerprint:
+            projection.update({field: 1 for field in FINGERPRINT_FIELDS})
+        if restat:
+            projection.update(STAT_PROJECTION)
+        existing = await self._find_by_ids(list(rows_by_id), projection)
+        for object_id in list(rows_by_id):
+            if object_id not in existing:
+                for idx, _ in rows_by_id.pop(object_id):
+                    errors.append({"row": idx, "error": "Question not found"})
+            elif refingerprint:
+                current = dict(existing[object_id])
+                for _, update in rows_by_id[object_id]:
+                    current = apply_set(current, update)
+                    if changes_content(update):
+                        update["fingerprint"] = question_fingerprint(current)
+        
+        now = datetime.utcnow()
+        events = []
+        reindex = set()
+        # Counted fields of each question as of its last successful wave
+        stats_before = {object_id: existing[object_id] for object_id in rows_by_id} if restat else {}
+        stats_after = dict(stats_before)
+        # A question listed more than once is updated in successive waves so the
+        # last row still wins, as it did when rows were applied one by one
+        waves = max((len(rows) for rows in rows_by_id.values()), default=0)
+        for wave in range(waves):
+            groups = {}
+            for object_id, rows in rows_by_id.items():
+                if wave < len(rows):
+                    idx, update = rows[wave]
+                    key = repr(sorted(update.items()))
+                    groups.setdefault(key, (update, []))[1].append((idx, object_id))
+            
+            operations = []
+            members = []
+            for update, group in groups.values():
+                changes = {**update, "updated_at": now}
+                ids = [object_id for _, object_id in group]
+                if len(ids) == 1:
+                    operations.append(UpdateOne({"_id": ids[0]}, {"$set": changes}))
+                else:
+                    operations.append(UpdateMany({"_id": {"$in": ids}}, {"$set": changes}))
+                members.append((changes, group))
+            
+            failed_ops = {}
+            try:
+                await self.db[self.collection_name].bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    failed_ops[write_error["index"]] = write_error.get("errmsg", str(e))
+            except Exception as e:
+                failed_ops = {position: str(e) for position in range(len(operations))}
+            
+            for position, (changes, group) in enumerate(members):
+                for idx, object_id in group:
+                    if position in failed_ops:
+                        errors.append({"row": idx, "error": failed_ops[position]})
+                    else:
+                        events.append(self.event_service.build_event(
+                            EventType.QUESTION_UPDATED,
+                            str(object_id),
+                            "Question",
+                            changes=changes
+                        ))
+                        if touches(changes, INDEXED_FIELDS):
+                            reindex.add(object_id)
+                        if moves_stats(changes):
+                            stats_after[object_id] = apply_set(stats_after[object_id], changes)
+        
+        if events:
+            search_cache.bump_epoch()
+        # Failed rows are invalidated too; an update_many may have applied to some of its ids
+        question_cache.invalidate(*rows_by_id)
+        moved = [object_id for object_id in stats_after if stats_after[object_id] is not stats_before[object_id]]
+        await self.stats_service.record(
+            added=[stats_after[object_id] for object_id in moved],
+            removed=[stats_before[object_id] for object_id in moved]
+        )
+        await search_index.refresh(self.db, list(reindex))
+        await self.event_service.insert_events(events)
+        
+        errors.sort(key=lambda error: error["row"])
+        return {"updated": len(events), "failed": len(errors), "errors": errors}
+    
+    async def _existing_ids(self, object_ids: List[ObjectId]) -> set:
+        """Return the subset of ids present in the collection with one projected query"""
+        return set(await self._find_by_ids(object_ids, {"_id": 1}))
+    
+    async def _find_by_ids(
+        self,
+        object_ids: List[ObjectId],
+        projection: Dict[str, Any]
+    ) -> Dict[ObjectId, Dict[str, Any]]:
+        """Map each stored id to its projected document with one $in query"""
+        if not object_ids:
+            return {}
+        cursor = self.db[self.collection_name].find({"_id": {"$in": object_ids}}, projection)
+        return {doc["_id"]: doc for doc in await cursor.to_list(length=None)}
     
     async def bulk_delete(self, question_ids: List[str]) -> Dict[str, Any]:
-        """Bulk delete questions"""
-        deleted = 0
-        failed = 0
-        
+        """Bulk delete questions with one lookup and one delete_many per batch"""
+        object_ids = []
+        seen = set()
         for question_id in question_ids:
-            try:
-                result = await self.db[self.collection_name].delete_one(
-                    {"_id": ObjectId(question_id)}
-                )
-                
-                if result.deleted_count > 0:
-                    await self.event_service.log_event(
-                        EventType.QUESTION_DELETED,
-                        question_id,
-                        "Question"
-                    )
-                    deleted += 1
-                else:
-                    failed += 1
-            except Exception:
-                failed += 1
+            # Invalid and repeated ids can never be deleted; they count as failed
+            if not ObjectId.is_valid(question_id):
+                continue
+            object_id = ObjectId(question_id)
+            if object_id not in seen:
+                seen.add(object_id)
+                object_ids.append(object_id)
+        
+        deleted = 0
+        for start in range(0, len(object_ids), BULK_WRITE_BATCH_SIZE):
+            batch = object_ids[start:start + BULK_WRITE_BATCH_SIZE]
+            existing = await self._find_by_ids(batch, STAT_PROJECTION)
+            if not existing:
+                continue
+            
+            found = [object_id for object_id in batch if object_id in existing]
+            result = await self.db[self.collection_name].delete_many({"_id": {"$in": found}})
+            deleted += result.deleted_count
+            search_cache.bump_epoch()
+            question_cache.invalidate(*found)
+            await self.stats_service.record(removed=list(existing.values()))
+            for object_id in found:
+                search_index.remove(str(object_id))
+            await self.event_service.log_events(
+                EventType.QUESTION_DELETED,
+                [str(object_id) for object_id in found],
+                "Question"
+            )
         
-        return {"deleted": deleted, "failed": failed}
+        return {"deleted": deleted, "failed": len(question_ids) - deleted}
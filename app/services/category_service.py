@@ -3,6 +3,7 @@ from bson import ObjectId
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from app.models import Category
+from app.utils import ETagHelper
 
 class CategoryService:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -21,6 +22,19 @@ class CategoryService:
         category = await self.db[self.collection_name].find_one({"_id": ObjectId(category_id)})
         return Category(**category) if category else None
     
+    async def get_category_etag(self, category_id: str) -> Optional[str]:
+        """ETag of a category from its projected updated_at, without reading the document"""
+        category = await self.db[self.collection_name].find_one({"_id": ObjectId(category_id)}, {"updated_at": 1})
+        return ETagHelper.document_etag(category["_id"], category.get("updated_at")) if category else None
+    
+    async def list_etag(self) -> str:
+        """ETag of the full list from the count and latest updated_at, without reading the documents"""
+        pipeline = [{"$group": {"_id": None, "count": {"$sum": 1}, "latest": {"$max": "$updated_at"}}}]
+        result = await self.db[self.collection_name].aggregate(pipeline).to_list(length=1)
+        if not result:
+            return ETagHelper.list_etag(0, None)
+        return ETagHelper.list_etag(result[0]["count"], result[0]["latest"])
+    
     async def list_categories(self) -> List[Category]:
         cursor = self.db[self.collection_name].find({})
         categories = await cursor.to_list(length=None)
@@ -0,0 +1,195 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+from app.config import EXAM_SAMPLE_FACTOR, EXAM_RETRY_SAMPLE_FACTOR
+from app.models import ExamAssemblyRequest
+from app.utils import INTERNAL_PROJECTION
+import asyncio
+
+# Just what the solver needs; full documents are fetched once the paper is chosen
+CANDIDATE_PROJECTION = {
+    "category_id": 1,
+    "metadata.tags": 1,
+    "metadata.difficulty": 1,
+    "metadata.time_limit_seconds": 1
+}
+
+def candidate_tags(candidate: Dict[str, Any]) -> set:
+    return set((candidate.get("metadata") or {}).get("tags") or [])
+
+def candidate_time(candidate: Dict[str, Any]) -> int:
+    """A question's time limit; questions without one count as 0"""
+    return (candidate.get("metadata") or {}).get("time_limit_seconds") or 0
+
+def solve_quotas(
+    pools: Dict[Optional[str], List[Dict[str, Any]]],
+    quotas: Dict[Optional[str], int],
+    category_ids: Optional[List[str]] = None,
+    max_per_tag: Optional[int] = None,
+    max_total_time: Optional[int] = None
+) -> Tuple[Dict[Optional[str], List[Dict[str, Any]]], Dict[Optional[str], int]]:
+    """Pick quotas[bucket] candidates from each pool within the tag cap and time budget
+
+    Buckets take turns choosing one question at a time so none of them uses up
+    the shared tag and time allowance. Each pick prefers a candidate within an
+    even share of the remaining time, then the least used category, then the
+    least used tags; pool order (random from $sample) breaks ties. Returns the
+    picks per bucket and how many each bucket is still short.
+    """
+    remaining = dict(quotas)
+    pools = {bucket: list(pools.get(bucket, [])) for bucket in quotas}
+    picked: Dict[Optional[str], List[Dict[str, Any]]] = {bucket: [] for bucket in quotas}
+    category_counts = Counter({category_id: 0 for category_id in category_ids or []})
+    tag_counts = Counter()
+    time_left = max_total_time
+
+    progressed = True
+    while progressed and any(remaining.values()):
+        progressed = False
+        for bucket in quotas:
+            if not remaining[bucket]:
+                continue
+            share = time_left / sum(remaining.values()) if time_left is not None else None
+            best, best_key = None, None
+            for index, candidate in enumerate(pools[bucket]):
+                tags = candidate_tags(candidate)
+                seconds = candidate_time(candidate)
+                if max_per_tag and any(tag_counts[tag] >= max_per_tag for tag in tags):
+                    continue
+                if time_left is not None and seconds > time_left:
+                    continue
+                over_share = share is not None and seconds > share
+                key = (
+                    over_share,
+                    seconds if over_share else 0,
+                    category_counts[candidate.get("category_id")],
+                    max((tag_counts[tag] for tag in tags), default=0),
+                    index
+                )
+                if best_key is None or key < best_key:
+                    best, best_key = index, key
+            if best is None:
+                continue
+
+            candidate = pools[bucket].pop(best)
+            picked[bucket].append(candidate)
+            remaining[bucket] -= 1
+            category_counts[candidate.get("category_id")] += 1
+            tag_counts.update(candidate_tags(candidate))
+            if time_left is not None:
+                time_left -= candidate_time(candidate)
+            progressed = True
+
+    return picked, {bucket: count for bucket, count in remaining.items() if count}
+
+class ExamService:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection_name = "questions"
+
+    async def assemble(self, request: ExamAssemblyRequest) -> Dict[str, Any]:
+        """Assemble an exam paper that meets the difficulty quotas, tag cap and time budget
+
+        Each difficulty bucket contributes a small random sample of compact
+        candidates, the quotas are solved in memory and the chosen questions
+        are read back in a single $in query. If the sample cannot meet the
+        constraints, a larger one is drawn once before giving up.
+        """
+        quotas = self._quotas(request)
+        filters = self._filters(request)
+
+        picked, short, retry = await self._attempt(request, filters, quotas, EXAM_SAMPLE_FACTOR)
+        if retry:
+            picked, short, _ = await self._attempt(request, filters, quotas, EXAM_RETRY_SAMPLE_FACTOR)
+        if short:
+            missing = ", ".join(f"{count} {bucket or 'any'}" for bucket, count in short.items())
+            raise ValueError(f"Not enough questions meet the constraints (short: {missing})")
+
+        ordered = [candidate["_id"] for bucket in quotas for candidate in picked[bucket]]
+        results = self.db[self.collection_name].find({"_id": {"$in": ordered}}, dict(INTERNAL_PROJECTION))
+        documents = {doc["_id"]: doc for doc in await results.to_list(length=None)}
+
+        questions = []
+        for question_id in ordered:
+            question = documents.get(question_id)
+            if question is None:
+                raise ValueError("Questions changed while the exam was assembled; retry")
+            question["_id"] = str(question["_id"])
+            questions.append(question)
+
+        return {
+            "total": len(questions),
+            "questions": questions,
+            "summary": self._summary(questions)
+        }
+
+    async def _attempt(
+        self,
+        request: ExamAssemblyRequest,
+        filters: Dict[str, Any],
+        quotas: Dict[Optional[str], int],
+        factor: int
+    ) -> Tuple[Dict[Optional[str], List[Dict[str, Any]]], Dict[Optional[str], int], bool]:
+        """Sample and solve once, returning (picked, short, whether a larger sample might help)"""
+        sizes = {bucket: quota * factor for bucket, quota in quotas.items()}
+        samples = await asyncio.gather(*(
+            self._sample(filters, bucket, size) for bucket, size in sizes.items()
+        ))
+        pools = dict(zip(quotas, samples))
+        picked, short = solve_quotas(
+            pools, quotas, request.category_ids, request.max_per_tag, request.max_total_time_seconds
+        )
+        # A bucket smaller than its sample was read in full; resampling cannot help it
+        retry = any(len(pools[bucket]) >= sizes[bucket] for bucket in short)
+        return picked, short, retry
+
+    async def _sample(self, filters: Dict[str, Any], difficulty: Optional[str], size: int) -> List[Dict[str, Any]]:
+        match = dict(filters)
+        if difficulty is not None:
+            match["metadata.difficulty"] = difficulty
+        pipeline = [
+            {"$match": match},
+            {"$sample": {"size": size}},
+            {"$project": CANDIDATE_PROJECTION}
+        ]
+        return await self.db[self.collection_name].aggregate(pipeline).to_list(length=None)
+
+    @staticmethod
+    def _quotas(request: ExamAssemblyRequest) -> Dict[Optional[str], int]:
+        """Questions wanted per difficulty; a single unconstrained bucket if none are given"""
+        if not request.difficulty:
+            return {None: request.total_questions}
+        quotas = {level.value: count for level, count in request.difficulty.items() if count}
+        if any(count < 0 for count in quotas.values()):
+            raise ValueError("Difficulty quotas cannot be negative")
+        if sum(quotas.values()) != request.total_questions:
+            raise ValueError("Difficulty quotas must add up to total_questions")
+        return quotas
+
+    @staticmethod
+    def _filters(request: ExamAssemblyRequest) -> Dict[str, Any]:
+        filters: Dict[str, Any] = {"metadata.is_active": {"$ne": False}}
+        if request.category_ids:
+            filters["category_id"] = {"$in": request.category_ids}
+        if request.source_ids:
+            filters["source_id"] = {"$in": request.source_ids}
+        if request.tags:
+            filters["metadata.tags"] = {"$in": request.tags}
+        if request.exclude_ids:
+            if not all(ObjectId.is_valid(question_id) for question_id in request.exclude_ids):
+                raise ValueError("Invalid question ID in exclude_ids")
+            filters["_id"] = {"$nin": [ObjectId(question_id) for question_id in request.exclude_ids]}
+        return filters
+
+    @staticmethod
+    def _summary(questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        by_difficulty = Counter((q.get("metadata") or {}).get("difficulty") for q in questions)
+        by_category = Counter(q.get("category_id") for q in questions)
+        by_tag = Counter(tag for q in questions for tag in candidate_tags(q))
+        return {
+            "by_difficulty": dict(by_difficulty),
+            "by_category": dict(by_category),
+            "by_tag": dict(by_tag),
+            "total_time_seconds": sum(candidate_time(q) for q in questions)
+        }
@@ -1,10 +1,19 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from app.models import Question, QuestionListResponse
+from typing import List, Optional, Dict, Any, Tuple, Union
+from app.models import Question, QuestionFieldsListResponse, QuestionListResponse
 from app.idempotency import IdempotencyService
 from app.events import EventService, EventType
+from app.exceptions import ConflictError
+from app.utils import FINGERPRINT_FIELDS, ETagHelper, KeysetPagination, PaginationHelper, ProjectionHelper, question_fingerprint
+from app.config import BATCH_GET_CHUNK_SIZE
+from app.cache import question_cache, search_cache
+from app.index_advisor import index_advisor
+from app.search_index import search_index
+from app.statistics import STAT_FIELDS, STAT_PROJECTION, StatisticsService
+from pymongo.errors import DuplicateKeyError
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,6 +24,7 @@ class QuestionService:
         self.collection_name = "questions"
         self.idempotency_service = IdempotencyService(db)
         self.event_service = EventService(db)
+        self.stats_service = StatisticsService(db)
     
     async def create_question(
         self,
@@ -29,12 +39,19 @@ class QuestionService:
         
         question_data["created_at"] = datetime.utcnow()
         question_data["updated_at"] = datetime.utcnow()
+        question_data["fingerprint"] = question_fingerprint(question_data)
         
-        result = await self.db[self.collection_name].insert_one(question_data)
+        try:
+            result = await self.db[self.collection_name].insert_one(question_data)
+        except DuplicateKeyError:
+            raise await self._duplicate_error(question_data["fingerprint"])
         
         created_question = await self.db[self.collection_name].find_one(
             {"_id": result.inserted_id}
         )
+        search_index.index(created_question)
+        search_cache.bump_epoch()
+        await self.stats_service.record(added=[created_question])
         question = Question(**created_question)
         
         # Log event
@@ -55,35 +72,163 @@ class QuestionService:
         return question
     
     async def get_question(self, question_id: str) -> Optional[Question]:
-        """Get a question by ID"""
+        """Get a question by ID, through the question cache"""
+        cached = question_cache.get(question_id)
+        if cached is not None:
+            return Question.parse_raw(cached[0])
+        loaded = await self._load_question(question_id)
+        return loaded[0] if loaded else None
+    
+    async def get_question_payload(self, question_id: str) -> Optional[Tuple[bytes, str]]:
+        """Get a question by ID as its serialized response body and ETag, through the question cache"""
+        cached = question_cache.get(question_id)
+        if cached is not None:
+            return cached
+        loaded = await self._load_question(question_id)
+        return loaded[1:] if loaded else None
+    
+    async def get_question_etag(self, question_id: str) -> Optional[str]:
+        """Get a question's ETag from the cache, or else from its projected updated_at"""
+        cached = question_cache.get(question_id)
+        if cached is not None:
+            return cached[1]
+        question = await self.db[self.collection_name].find_one(
+            {"_id": ObjectId(question_id)}, {"updated_at": 1}
+        )
+        return ETagHelper.document_etag(question["_id"], question.get("updated_at")) if question else None
+    
+    async def _load_question(self, question_id: str) -> Optional[tuple]:
+        """Read a question from the database and cache its serialized form and ETag"""
+        generation = question_cache.generation
         question = await self.db[self.collection_name].find_one(
             {"_id": ObjectId(question_id)}
         )
-        if question:
-            return Question(**question)
-        return None
+        if not question:
+            return None
+        etag = ETagHelper.document_etag(question["_id"], question.get("updated_at"))
+        model = Question(**question)
+        payload = model.json(by_alias=True).encode()
+        question_cache.set(question_id, payload, etag, generation)
+        return model, payload, etag
+    
+    async def get_questions(
+        self,
+        question_ids: List[str],
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Get many questions by ID in request order, reporting the ones not found
+        
+        Every ID is validated before anything is read; duplicates are fetched
+        once. IDs are read in chunks of BATCH_GET_CHUNK_SIZE with concurrent
+        $in queries.
+        """
+        invalid = [question_id for question_id in question_ids if not ObjectId.is_valid(question_id)]
+        if invalid:
+            raise ValueError(f"Invalid question ID format: {', '.join(invalid)}")
+        projection = ProjectionHelper.read_projection(ProjectionHelper.build_projection(fields))
+        
+        ordered = list(dict.fromkeys(question_ids))
+        object_ids = [ObjectId(question_id) for question_id in ordered]
+        chunks = [
+            object_ids[i:i + BATCH_GET_CHUNK_SIZE]
+            for i in range(0, len(object_ids), BATCH_GET_CHUNK_SIZE)
+        ]
+        results = await asyncio.gather(*(
+            self.db[self.collection_name].find({"_id": {"$in": chunk}}, projection).to_list(length=None)
+            for chunk in chunks
+        ))
+        
+        documents = {}
+        for chunk in results:
+            for question in chunk:
+                question["_id"] = str(question["_id"])
+                documents[question["_id"]] = question
+        
+        return {
+            "items": [documents[question_id] for question_id in ordered if question_id in documents],
+            "missing": [question_id for question_id in ordered if question_id not in documents]
+        }
     
     async def list_questions(
         self,
         page: int,
         page_size: int,
-        filters: Optional[Dict[str, Any]] = None
-    ) -> QuestionListResponse:
-        """List questions with pagination and filtering"""
+        filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None,
+        include_total: str = "true",
+        fields: Optional[List[str]] = None,
+        validate: bool = True
+    ) -> Union[QuestionListResponse, QuestionFieldsListResponse, Dict[str, Any]]:
+        """List questions with pagination and filtering
+        
+        Passing a cursor (empty for the first page) switches to keyset
+        pagination, which skips the total count. fields trims each item to
+        those fields plus _id and created_at, returned without building models.
+        With validate=False the page is a plain dict of stored documents for
+        FastJSONResponse to encode, and no models are built at all.
+        """
         filters = filters or {}
+        collection = self.db[self.collection_name]
+        projection = ProjectionHelper.build_projection(fields, required=("created_at",))
+        read_projection = ProjectionHelper.read_projection(projection)
         
-        total = await self.db[self.collection_name].count_documents(filters)
+        if cursor is not None:
+            keyset_filters = KeysetPagination.apply_cursor(filters, cursor)
+            results = collection.find(keyset_filters, read_projection).sort(KeysetPagination.SORT).limit(page_size + 1)
+            with index_advisor.track(keyset_filters, KeysetPagination.SORT):
+                questions = await results.to_list(length=page_size + 1)
+            next_cursor = None
+            if len(questions) > page_size:
+                questions = questions[:page_size]
+                next_cursor = KeysetPagination.encode_cursor(questions[-1])
+            return self._list_response(questions, None, page, page_size, next_cursor, projection, validate)
         
         skip = (page - 1) * page_size
-        cursor = self.db[self.collection_name].find(filters).skip(skip).limit(page_size)
-        questions = await cursor.to_list(length=page_size)
+        questions, total, has_more, _ = await PaginationHelper.fetch_page(
+            collection, filters, skip, page_size, include_total, projection=read_projection
+        )
         
+        next_cursor = None
+        if questions and has_more:
+            next_cursor = KeysetPagination.encode_cursor(questions[-1])
+        
+        return self._list_response(questions, total, page, page_size, next_cursor, projection, validate)
+    
+    @staticmethod
+    def _list_response(
+        questions: List[Dict[str, Any]],
+        total: Optional[int],
+        page: int,
+        page_size: int,
+        next_cursor: Optional[str],
+        projection: Optional[Dict[str, int]],
+        validate: bool = True
+    ) -> Union[QuestionListResponse, QuestionFieldsListResponse, Dict[str, Any]]:
+        if not validate:
+            return {
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "items": questions,
+                "next_cursor": next_cursor
+            }
+        if projection:
+            for q in questions:
+                q["_id"] = str(q["_id"])
+            return QuestionFieldsListResponse(
+                total=total,
+                page=page,
+                page_size=page_size,
+                items=questions,
+                next_cursor=next_cursor
+            )
         items = [Question(**q) for q in questions]
         return QuestionListResponse(
             total=total,
             page=page,
             page_size=page_size,
-            items=items
+            items=items,
+            next_cursor=next_cursor
         )
     
     async def update_question(
@@ -94,13 +239,35 @@ class QuestionService:
         """Update a question"""
         update_data["updated_at"] = datetime.utcnow()
         
-        result = await self.db[self.collection_name].find_one_and_update(
-            {"_id": ObjectId(question_id)},
-            {"$set": update_data},
-            return_document=True
-        )
+        changes_content = any(field in update_data for field in FINGERPRINT_FIELDS)
+        moves_stats = any(field in update_data for field in STAT_FIELDS)
+        current = None
+        if changes_content or moves_stats:
+            current = await self.db[self.collection_name].find_one(
+                {"_id": ObjectId(question_id)},
+                {**{field: 1 for field in FINGERPRINT_FIELDS}, **STAT_PROJECTION}
+            )
+            if not current:
+                return None
+            if changes_content:
+                update_data["fingerprint"] = question_fingerprint({**current, **update_data})
+        
+        try:
+            result = await self.db[self.collection_name].find_one_and_update(
+                {"_id": ObjectId(question_id)},
+                {"$set": update_data},
+                return_document=True
+            )
+        except DuplicateKeyError:
+            raise await self._duplicate_error(update_data["fingerprint"])
         
         if result:
+            search_index.index(result)
+            search_cache.bump_epoch()
+            question_cache.invalidate(question_id)
+            if moves_stats:
+                await self.stats_service.record(added=[result], removed=[current])
+            
             # Log event
             await self.event_service.log_event(
                 EventType.QUESTION_UPDATED,
@@ -113,11 +280,17 @@ class QuestionService:
     
     async def delete_question(self, question_id: str) -> bool:
         """Delete a question"""
-        result = await self.db[self.collection_name].delete_one(
-            {"_id": ObjectId(question_id)}
+        deleted = await self.db[self.collection_name].find_one_and_delete(
+            {"_id": ObjectId(question_id)},
+            projection=STAT_PROJECTION
         )
         
-        if result.deleted_count > 0:
+        if deleted:
+            search_index.remove(question_id)
+            search_cache.bump_epoch()
+            question_cache.invalidate(question_id)
+            await self.stats_service.record(removed=[deleted])
+            
             # Log event
             await self.event_service.log_event(
                 EventType.QUESTION_DELETED,
@@ -127,6 +300,15 @@ class QuestionService:
             return True
         return False
     
+    async def _duplicate_error(self, fingerprint: str) -> ConflictError:
+        """Build a 409 pointing at the question that already has this content"""
+        existing = await self.db[self.collection_name].find_one(
+            {"fingerprint": fingerprint}, {"_id": 1}
+        )
+        if existing:
+            return ConflictError(f"Duplicate of question {existing['_id']}")
+        return ConflictError("Duplicate question")
+    
     async def count_by_category(self, category_id: str) -> int:
         """Count questions in a category"""
         count = await self.db[self.collection_name].count_documents(
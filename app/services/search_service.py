@@ -1,6 +1,12 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
 from typing import Dict, Any, Optional, List
-from app.utils import PaginationHelper
+from app.cache import search_cache
+from app.config import SEARCH_INDEX_MAX_IDS
+from app.index_advisor import index_advisor
+from app.search_index import search_index
+from app.statistics import StatisticsService
+from app.utils import KeysetPagination, PaginationHelper, ProjectionHelper, SearchFilters
 
 class SearchService:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -11,112 +17,232 @@ class SearchService:
         self,
         query: str,
         page: int,
-        page_size: int
+        page_size: int,
+        mode: str = "text",
+        cursor: Optional[str] = None,
+        include_total: str = "true",
+        fuzzy: bool = False,
+        fields: Optional[List[str]] = None
     ) -> Dict[str, Any]:
-        """Perform text search"""
+        """Perform text search, ranked by relevance in "text" and fuzzy modes"""
+        if search_index.ready and cursor is None:
+            match = "fuzzy" if fuzzy else mode
+            projection = ProjectionHelper.build_projection(fields, required=("created_at",))
+            return await self._cached(
+                ("text", match, query, page, page_size, projection),
+                lambda: self._indexed_text_search(query, match, page, page_size, projection)
+            )
+        filters = self.text_filters(query, mode, fuzzy)
+        return await self.advanced_search(filters, page, page_size, cursor, include_total, fields=fields)
+    
+    def text_filters(self, query: str, mode: str = "text", fuzzy: bool = False) -> Dict[str, Any]:
+        """Build the filter for a text query, resolving it through the search index when possible
+        
+        Fuzzy and indexed substring matches become an _id $in filter, so they
+        combine with other filters at the cost of relevance order.
+        """
+        if fuzzy:
+            if not search_index.ready:
+                raise ValueError("Fuzzy search requires the search index (SEARCH_INDEX_ENABLED)")
+            _, ranked = search_index.fuzzy_search(query, SEARCH_INDEX_MAX_IDS)
+            return {"_id": {"$in": [ObjectId(question_id) for question_id, _ in ranked]}}
+        if mode == "substring" and search_index.ready:
+            total, ranked = search_index.substring_search(query, SEARCH_INDEX_MAX_IDS)
+            if total <= SEARCH_INDEX_MAX_IDS:
+                return {"_id": {"$in": [ObjectId(question_id) for question_id, _ in ranked]}}
+        return SearchFilters.build_text_search(query, mode)
+    
+    async def _indexed_text_search(
+        self,
+        query: str,
+        match: str,
+        page: int,
+        page_size: int,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """Rank with the in-process search index, then fetch just the page by _id"""
+        search = {
+            "text": search_index.search,
+            "substring": search_index.substring_search,
+            "fuzzy": search_index.fuzzy_search
+        }[match]
         page, page_size = PaginationHelper.validate_pagination(page, page_size)
         skip = PaginationHelper.calculate_skip(page, page_size)
         
-        filters = {
-            "$or": [
-                {"text": {"$regex": query, "$options": "i"}},
-                {"explanation": {"$regex": query, "$options": "i"}},
-                {"metadata.tags": {"$regex": query, "$options": "i"}}
-            ]
-        }
-        
-        total = await self.db[self.collection_name].count_documents(filters)
-        cursor = self.db[self.collection_name].find(filters).skip(skip).limit(page_size)
-        items = await cursor.to_list(length=page_size)
+        total, ranked = search(query, skip + page_size)
+        hits = ranked[skip:]
+        results = self.db[self.collection_name].find(
+            {"_id": {"$in": [ObjectId(question_id) for question_id, _ in hits]}},
+            ProjectionHelper.read_projection(projection)
+        )
+        documents = {str(doc["_id"]): doc for doc in await results.to_list(length=None)}
         
-        # Convert ObjectId to string
-        for item in items:
-            item["_id"] = str(item["_id"])
+        items = []
+        for question_id, score in hits:
+            item = documents.get(question_id)
+            if item:
+                item["_id"] = question_id
+                item["score"] = score
+                items.append(item)
         
         return {
             "total": total,
             "page": page,
             "page_size": page_size,
-            "items": items
+            "items": items,
+            "next_cursor": None
         }
     
     async def advanced_search(
         self,
         filters: Dict[str, Any],
         page: int,
-        page_size: int
+        page_size: int,
+        cursor: Optional[str] = None,
+        include_total: str = "true",
+        facets: Optional[List[str]] = None,
+        fields: Optional[List[str]] = None
     ) -> Dict[str, Any]:
-        """Perform advanced search with multiple filters"""
+        """Perform advanced search with multiple filters
+        
+        With a cursor (empty for the first page) results are read in
+        (created_at, _id) order, even for text queries, and no total is counted.
+        facets adds the most common values of the named fields among all matches.
+        fields trims each item to those fields, plus _id and created_at.
+        """
         page, page_size = PaginationHelper.validate_pagination(page, page_size)
+        facet_pipelines = SearchFilters.build_facets(facets) if facets else {}
+        projection = ProjectionHelper.build_projection(fields, required=("created_at",))
+        return await self._cached(
+            ("advanced", filters, page, page_size, cursor, include_total, sorted(facet_pipelines), projection),
+            lambda: self._advanced_search(
+                filters, page, page_size, cursor, include_total, facet_pipelines, projection
+            )
+        )
+    
+    async def _cached(self, key_parts: tuple, compute) -> Dict[str, Any]:
+        """Serve a result from the search cache, computing and storing it on a miss"""
+        key = search_cache.make_key(*key_parts)
+        result = search_cache.get(key)
+        if result is None:
+            epoch = search_cache.epoch
+            result = await compute()
+            search_cache.set(key, result, epoch)
+        return result
+    
+    async def _advanced_search(
+        self,
+        filters: Dict[str, Any],
+        page: int,
+        page_size: int,
+        cursor: Optional[str],
+        include_total: str,
+        facet_pipelines: Dict[str, List[Dict[str, Any]]],
+        projection: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        if cursor is not None:
+            result = await self._keyset_search(filters, page, page_size, cursor, projection)
+            if facet_pipelines:
+                result["facets"] = await self._facet_counts(filters, facet_pipelines)
+            return result
         skip = PaginationHelper.calculate_skip(page, page_size)
         
-        total = await self.db[self.collection_name].count_documents(filters)
-        cursor = self.db[self.collection_name].find(filters).skip(skip).limit(page_size)
-        items = await cursor.to_list(length=page_size)
+        # Filtered facets ride along in the page's $facet; unfiltered ones come from the cache
+        items, total, has_more, facet_results = await PaginationHelper.fetch_page(
+            self.db[self.collection_name], filters, skip, page_size, include_total,
+            facet_pipelines if filters else None, ProjectionHelper.read_projection(projection)
+        )
         
         # Convert ObjectId to string
         for item in items:
             item["_id"] = str(item["_id"])
         
-        return {
+        # Relevance order has no keyset; text queries start cursor mode with cursor=""
+        next_cursor = None
+        if "$text" not in filters and items and has_more:
+            next_cursor = KeysetPagination.encode_cursor(items[-1])
+        
+        result = {
             "total": total,
             "page": page,
             "page_size": page_size,
-            "items": items
+            "items": items,
+            "next_cursor": next_cursor
         }
+        if facet_pipelines:
+            if filters:
+                result["facets"] = self._format_facets(facet_results)
+            else:
+                result["facets"] = await self._facet_counts(filters, facet_pipelines)
+        return result
     
-    async def search_by_difficulty(
+    async def _facet_counts(
         self,
-        difficulty: str,
+        filters: Dict[str, Any],
+        facet_pipelines: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Run the facets on their own; unfiltered counts are cached until the next write"""
+        async def compute():
+            pipeline = [{"$match": filters}, {"$facet": facet_pipelines}]
+            result = await self.db[self.collection_name].aggregate(pipeline).to_list(length=1)
+            return self._format_facets(result[0])
+        
+        if filters:
+            return await compute()
+        return await self._cached(("facets", sorted(facet_pipelines)), compute)
+    
+    @staticmethod
+    def _format_facets(facet_results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            name: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in buckets]
+            for name, buckets in facet_results.items()
+        }
+    
+    async def _keyset_search(
+        self,
+        filters: Dict[str, Any],
         page: int,
-        page_size: int
+        page_size: int,
+        cursor: str,
+        projection: Optional[Dict[str, int]] = None
     ) -> Dict[str, Any]:
-        """Search questions by difficulty level"""
-        page, page_size = PaginationHelper.validate_pagination(page, page_size)
-        skip = PaginationHelper.calculate_skip(page, page_size)
-        
-        filters = {"metadata.difficulty": difficulty}
+        """Read the page after a cursor; one extra item tells whether more follow"""
+        keyset_filters = KeysetPagination.apply_cursor(filters, cursor)
+        results = self.db[self.collection_name].find(
+            keyset_filters, ProjectionHelper.read_projection(projection)
+        ).sort(KeysetPagination.SORT).limit(page_size + 1)
+        with index_advisor.track(keyset_filters, KeysetPagination.SORT):
+            items = await results.to_list(length=page_size + 1)
         
-        total = await self.db[self.collection_name].count_documents(filters)
-        cursor = self.db[self.collection_name].find(filters).skip(skip).limit(page_size)
-        items = await cursor.to_list(length=page_size)
+        next_cursor = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            next_cursor = KeysetPagination.encode_cursor(items[-1])
         
-        # Convert ObjectId to string
         for item in items:
             item["_id"] = str(item["_id"])
         
         return {
-            "total": total,
+            "total": None,
             "page": page,
             "page_size": page_size,
-            "items": items
+            "items": items,
+            "next_cursor": next_cursor
         }
     
+    async def search_by_difficulty(
+        self,
+        difficulty: str,
+        page: int,
+        page_size: int,
+        cursor: Optional[str] = None,
+        include_total: str = "true",
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Search questions by difficulty level"""
+        filters = {"metadata.difficulty": difficulty}
+        return await self.advanced_search(filters, page, page_size, cursor, include_total, fields=fields)
+    
     async def get_statistics(self) -> Dict[str, Any]:
-        """Get database statistics"""
-        total_questions = await self.db[self.collection_name].count_documents({})
-        
-        # Group by difficulty
-        difficulty_pipeline = [
-            {"$group": {"_id": "$metadata.difficulty", "count": {"$sum": 1}}}
-        ]
-        difficulty_stats = await self.db[self.collection_name].aggregate(difficulty_pipeline).to_list(None)
-        
-        # Group by category
-        category_pipeline = [
-            {"$group": {"_id": "$category_id", "count": {"$sum": 1}}}
-        ]
-        category_stats = await self.db[self.collection_name].aggregate(category_pipeline).to_list(None)
-        
-        # Group by source
-        source_pipeline = [
-            {"$group": {"_id": "$source_id", "count": {"$sum": 1}}}
-        ]
-        source_stats = await self.db[self.collection_name].aggregate(source_pipeline).to_list(None)
-        
-        return {
-            "total_questions": total_questions,
-            "by_difficulty": {item["_id"]: item["count"] for item in difficulty_stats},
-            "by_category": {item["_id"]: item["count"] for item in category_stats},
-            "by_source": {item["_id"]: item["count"] for item in source_stats}
-        }
+        """Get database statistics from the materialized counters"""
+        return await StatisticsService(self.db).get_statistics()
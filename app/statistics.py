@@ -0,0 +1,144 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Any, Iterable, Optional
+from urllib.parse import unquote
+from app.config import STATS_RECONCILE_INTERVAL
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATS_ID = "questions"
+
+# Question fields whose $set can move a question between counters
+STAT_FIELDS = ("category_id", "source_id", "metadata")
+STAT_PROJECTION = {"category_id": 1, "source_id": 1, "metadata.difficulty": 1}
+
+DIMENSIONS = {
+    "by_difficulty": lambda question: (question.get("metadata") or {}).get("difficulty"),
+    "by_category": lambda question: question.get("category_id"),
+    "by_source": lambda question: question.get("source_id"),
+}
+
+# Field names for values with no usable text; "%" in real values is always escaped
+NULL_KEY = "%null"
+EMPTY_KEY = "%empty"
+
+def _encode_key(value: Any) -> str:
+    """Make a grouped value safe to use as a field name"""
+    if value is None:
+        return NULL_KEY
+    if isinstance(value, Enum):
+        value = value.value
+    key = str(value).replace("%", "%25").replace(".", "%2E")
+    if not key:
+        return EMPTY_KEY
+    return "%24" + key[1:] if key.startswith("$") else key
+
+def _decode_key(key: str) -> Optional[str]:
+    if key == NULL_KEY:
+        return None
+    return "" if key == EMPTY_KEY else unquote(key)
+
+class StatisticsService:
+    """Maintains per-dimension question counters in one question_stats document"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection_name = "question_stats"
+
+    @staticmethod
+    def delta(
+        added: Iterable[Dict[str, Any]] = (),
+        removed: Iterable[Dict[str, Any]] = ()
+    ) -> Dict[str, int]:
+        """$inc paths for questions entering and leaving the counters"""
+        inc: Dict[str, int] = {}
+        for questions, sign in ((added, 1), (removed, -1)):
+            for question in questions:
+                inc["total"] = inc.get("total", 0) + sign
+                for dimension, value_of in DIMENSIONS.items():
+                    path = f"{dimension}.{_encode_key(value_of(question))}"
+                    inc[path] = inc.get(path, 0) + sign
+        return {path: count for path, count in inc.items() if count}
+
+    async def record(
+        self,
+        added: Iterable[Dict[str, Any]] = (),
+        removed: Iterable[Dict[str, Any]] = ()
+    ) -> None:
+        """Apply questions created (added), deleted (removed) or both (moved) with one $inc"""
+        inc = self.delta(added, removed)
+        if inc:
+            await self.db[self.collection_name].update_one(
+                {"_id": STATS_ID},
+                {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+
+    async def get_statistics(self) -> Dict[str, Any]:
+        """Read the counters, building them on first use"""
+        stats = await self.db[self.collection_name].find_one({"_id": STATS_ID})
+        if stats is None:
+            stats = await self.reconcile()
+        return {
+            "total_questions": stats.get("total", 0),
+            **{
+                dimension: {
+                    _decode_key(key): count
+                    for key, count in (stats.get(dimension) or {}).items() if count
+                }
+                for dimension in DIMENSIONS
+            }
+        }
+
+    async def reconcile(self) -> Dict[str, Any]:
+        """Recount every question and overwrite the counters to correct any drift"""
+        pipeline = [{"$facet": {
+            "total": [{"$count": "count"}],
+            "by_difficulty": [{"$group": {"_id": "$metadata.difficulty", "count": {"$sum": 1}}}],
+            "by_category": [{"$group": {"_id": "$category_id", "count": {"$sum": 1}}}],
+            "by_source": [{"$group": {"_id": "$source_id", "count": {"$sum": 1}}}]
+        }}]
+        result = (await self.db["questions"].aggregate(pipeline).to_list(length=1))[0]
+
+        stats = {
+            "total": result["total"][0]["count"] if result["total"] else 0,
+            **{
+                dimension: {_encode_key(item["_id"]): item["count"] for item in result[dimension]}
+                for dimension in DIMENSIONS
+            },
+            "updated_at": datetime.utcnow(),
+            "reconciled_at": datetime.utcnow()
+        }
+        await self.db[self.collection_name].replace_one({"_id": STATS_ID}, stats, upsert=True)
+        stats["_id"] = STATS_ID
+        return stats
+
+class StatisticsReconciler:
+    """Periodically recounts the statistics document in the background"""
+
+    def __init__(self, interval: int = STATS_RECONCILE_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(StatisticsService(db)))
+
+    async def _run(self, service: StatisticsService) -> None:
+        while True:
+            try:
+                await service.reconcile()
+            except Exception as e:
+                logger.error(f"Statistics reconciliation failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+stats_reconciler = StatisticsReconciler()
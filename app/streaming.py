@@ -0,0 +1,200 @@
+import asyncio
+import codecs
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator
+from bson import ObjectId
+from app.config import STREAM_CHUNK_SIZE, MAX_IMPORT_ROW_BYTES
+
+# Characters that can continue a JSON number past a chunk boundary
+NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+# Returned by _parse_ndjson_line for a blank line; a literal null is a row
+BLANK_LINE = object()
+
+class InvalidRow:
+    """Placeholder yielded for a single row that could not be parsed"""
+
+    def __init__(self, error: str):
+        self.error = error
+
+class StreamFormatError(ValueError):
+    """Raised when an upload is malformed beyond a single row"""
+
+async def iter_chunks(upload, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read an UploadFile (or any object with async read) chunk by chunk"""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+class SpooledUpload:
+    """Async reader over an upload copied to a local temporary file"""
+
+    def __init__(self, path: str, sha256: str):
+        self.path = path
+        self.sha256 = sha256
+        self._file = None
+
+    async def read(self, size: int = -1) -> bytes:
+        if self._file is None:
+            self._file = open(self.path, "rb")
+        return await asyncio.to_thread(self._file.read, size)
+
+    def remove(self) -> None:
+        """Close and delete the temporary file"""
+        if self._file is not None:
+            self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+async def spool_upload(upload) -> SpooledUpload:
+    """Copy an upload to a temporary file so it outlives the request"""
+    digest = hashlib.sha256()
+    handle, path = tempfile.mkstemp(prefix="mds-upload-")
+    try:
+        with os.fdopen(handle, "wb") as spool:
+            async for chunk in iter_chunks(upload):
+                digest.update(chunk)
+                await asyncio.to_thread(spool.write, chunk)
+    except Exception:
+        os.unlink(path)
+        raise
+    return SpooledUpload(path, digest.hexdigest())
+
+async def hash_upload(upload) -> str:
+    """SHA-256 of an UploadFile's contents, rewound afterwards for parsing"""
+    digest = hashlib.sha256()
+    async for chunk in iter_chunks(upload):
+        digest.update(chunk)
+    await upload.seek(0)
+    return digest.hexdigest()
+
+async def iter_ndjson_rows(upload) -> AsyncIterator[Any]:
+    """Yield one parsed value per non-blank line of an NDJSON upload"""
+    pending = b""
+    async for chunk in iter_chunks(upload):
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            row = _parse_ndjson_line(line)
+            if row is not BLANK_LINE:
+                yield row
+        if len(pending) > MAX_IMPORT_ROW_BYTES:
+            raise StreamFormatError(f"Row exceeds maximum size of {MAX_IMPORT_ROW_BYTES} bytes")
+
+    row = _parse_ndjson_line(pending)
+    if row is not BLANK_LINE:
+        yield row
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    """Parse one NDJSON line; BLANK_LINE for blank lines"""
+    line = line.strip()
+    if not line:
+        return BLANK_LINE
+    try:
+        return json.loads(line)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        return InvalidRow(f"Invalid JSON: {e}")
+
+async def iter_json_array_rows(upload) -> AsyncIterator[Any]:
+    """Yield the elements of a top-level JSON array without buffering the upload"""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter_chunks(upload)
+    buffer = ""
+    pos = 0
+    eof = False
+    expecting = "["
+    row = 0
+
+    async def fill() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            chunk = b""
+            eof = True
+        try:
+            text = text_decoder.decode(chunk, final=eof)
+        except UnicodeDecodeError:
+            raise StreamFormatError("Invalid JSON format: upload is not valid UTF-8")
+        if eof:
+            return False
+        buffer = buffer[pos:] + text
+        pos = 0
+        if len(buffer) > MAX_IMPORT_ROW_BYTES + STREAM_CHUNK_SIZE:
+            raise StreamFormatError(f"Row exceeds maximum size of {MAX_IMPORT_ROW_BYTES} bytes")
+        return True
+
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos == len(buffer):
+            if await fill():
+                continue
+            if expecting == "[":
+                raise StreamFormatError("Expected JSON array")
+            if expecting != "end":
+                raise StreamFormatError(f"Invalid JSON format: unexpected end of file at row {row}")
+            return
+
+        char = buffer[pos]
+        if expecting == "[":
+            if char != "[":
+                raise StreamFormatError("Expected JSON array")
+            pos += 1
+            expecting = "value_or_close"
+        elif expecting == "end":
+            raise StreamFormatError("Invalid JSON format: data after end of array")
+        elif expecting in ("value_or_close", "separator") and char == "]":
+            pos += 1
+            expecting = "end"
+        elif expecting == "separator":
+            if char != ",":
+                raise StreamFormatError(f"Invalid JSON format: expected ',' after row {row - 1}")
+            pos += 1
+            expecting = "value"
+        else:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if await fill():
+                    continue
+                raise StreamFormatError(f"Invalid JSON format at row {row}: {e.msg}")
+            # A number followed only by number characters may continue in the
+            # next chunk (e.g. "-1.5e" | "3"), so read more before accepting it
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and all(c in NUMBER_CHARS for c in buffer[end:])
+                    and await fill()):
+                continue
+            pos = end
+            row += 1
+            expecting = "separator"
+            yield value
+
+def json_default(value: Any) -> Any:
+    """json.dumps fallback for the BSON types found in stored documents"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip-compress a byte stream on the fly"""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,19 +1,90 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
+from bson import ObjectId
+from app.config import MAX_FACET_VALUES
+from app.index_advisor import index_advisor
+import base64
+import hashlib
+import json
 import re
+import unicodedata
+
+# Fields that make two questions the same question
+FINGERPRINT_FIELDS = ("text", "options", "correct_answer", "category_id", "source_id")
+
+FACET_FIELDS = {
+    "tags": "metadata.tags",
+    "difficulty": "metadata.difficulty",
+    "category": "category_id",
+    "source": "source_id"
+}
+
+# Top-level question fields a caller may select in a projection
+QUESTION_FIELDS = (
+    "text", "category_id", "source_id", "type", "options", "correct_answer",
+    "explanation", "metadata", "created_at", "updated_at"
+)
+
+# Stored fields that are not part of the Question model and never leave the service
+INTERNAL_PROJECTION = {"fingerprint": 0}
+
+class ProjectionHelper:
+    """Helper for building projections from caller-selected fields"""
+    
+    @staticmethod
+    def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+        """Split a comma-separated fields= query parameter"""
+        if fields is None:
+            return None
+        return [field.strip() for field in fields.split(",") if field.strip()]
+    
+    @staticmethod
+    def build_projection(
+        fields: Optional[List[str]],
+        required: tuple = ()
+    ) -> Optional[Dict[str, int]]:
+        """Build an inclusion projection; None (whole documents) when no fields are given
+        
+        Fields may be dotted paths below a question field, e.g. metadata.difficulty.
+        _id is always returned, as are the required fields (e.g. the cursor keys).
+        """
+        if not fields:
+            return None
+        projection = {field: 1 for field in required}
+        for field in fields:
+            field = field.strip()
+            if field == "_id":
+                continue
+            if field.split(".", 1)[0] not in QUESTION_FIELDS or "$" in field or ".." in field or field.endswith("."):
+                raise ValueError(f"Unknown field: {field}")
+            projection[field] = 1
+        return projection or {"_id": 1}
+    
+    @staticmethod
+    def read_projection(projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Projection for reading raw documents: the caller's fields, else all but internal fields"""
+        return projection or dict(INTERNAL_PROJECTION)
 
 class SearchFilters:
     """Helper class for building search filters"""
     
     @staticmethod
-    def build_text_search(query: str) -> Dict[str, Any]:
-        """Build text search filter"""
-        return {
-            "$or": [
-                {"text": {"$regex": query, "$options": "i"}},
-                {"explanation": {"$regex": query, "$options": "i"}}
-            ]
-        }
+    def build_text_search(query: str, mode: str = "text") -> Dict[str, Any]:
+        """Build text search filter
+        
+        "text" uses the weighted text index; "substring" matches the query
+        literally (regex metacharacters escaped) and cannot use an index.
+        """
+        if mode == "substring":
+            pattern = re.escape(query)
+            return {
+                "$or": [
+                    {"text": {"$regex": pattern, "$options": "i"}},
+                    {"explanation": {"$regex": pattern, "$options": "i"}},
+                    {"metadata.tags": {"$regex": pattern, "$options": "i"}}
+                ]
+            }
+        return {"$text": {"$search": query}}
     
     @staticmethod
     def build_difficulty_filter(difficulty: str) -> Dict[str, Any]:
@@ -40,6 +111,23 @@ class SearchFilters:
         """Build tag filter"""
         return {"metadata.tags": {"$in": tags}}
     
+    @staticmethod
+    def build_facets(names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Build $facet sub-pipelines counting the most common values of each named field"""
+        facets = {}
+        for name in names:
+            field = FACET_FIELDS.get(name)
+            if field is None:
+                raise ValueError(f"Unknown facet '{name}'. Use: {', '.join(FACET_FIELDS)}")
+            pipeline = [{"$unwind": f"${field}"}] if name == "tags" else []
+            pipeline += [
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": MAX_FACET_VALUES}
+            ]
+            facets[name] = pipeline
+        return facets
+    
     @staticmethod
     def combine_filters(*filters: Dict[str, Any]) -> Dict[str, Any]:
         """Combine multiple filters with AND logic"""
@@ -49,6 +137,48 @@ class SearchFilters:
                 combined.update(f)
         return combined
 
+class KeysetPagination:
+    """Opaque cursors over the (created_at, _id) sort order
+    
+    An empty cursor starts from the beginning; each page's next_cursor marks
+    its last item, so the next page is found with an index seek instead of a skip.
+    """
+    
+    SORT = [("created_at", 1), ("_id", 1)]
+    
+    @staticmethod
+    def encode_cursor(item: Dict[str, Any]) -> str:
+        """Build the cursor that resumes after this item"""
+        payload = json.dumps([item["created_at"].isoformat(), str(item["_id"])])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[tuple]:
+        """Return the (created_at, _id) position of a cursor; None for the first page"""
+        if not cursor:
+            return None
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, question_id = json.loads(payload)
+            return datetime.fromisoformat(created_at), ObjectId(question_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
+    @staticmethod
+    def apply_cursor(filters: Dict[str, Any], cursor: str) -> Dict[str, Any]:
+        """Restrict filters to the items after the cursor position"""
+        position = KeysetPagination.decode_cursor(cursor)
+        if position is None:
+            return filters
+        created_at, object_id = position
+        after = {
+            "$or": [
+                {"created_at": {"$gt": created_at}},
+                {"created_at": created_at, "_id": {"$gt": object_id}}
+            ]
+        }
+        return {"$and": [filters, after]} if filters else after
+
 class PaginationHelper:
     """Helper for pagination calculations"""
     
@@ -65,6 +195,93 @@ class PaginationHelper:
         page = max(1, page)
         page_size = max(1, min(page_size, 100))  # Max 100 per page
         return page, page_size
+    
+    @staticmethod
+    async def fetch_page(
+        collection,
+        filters: Dict[str, Any],
+        skip: int,
+        limit: int,
+        include_total: str = "true",
+        facets: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> tuple:
+        """Fetch one page and its total in a single round trip
+        
+        include_total is "true" for an exact count computed by $facet alongside
+        the page, "false" to skip counting, or "estimated" to read the count from
+        collection metadata when there are no filters. $text filters sort by
+        relevance, everything else by the keyset order. facets are extra $facet
+        sub-pipelines run in the same aggregation, which also counts the total.
+        projection trims the returned items only. Returns (items, total,
+        has_more, facet_results).
+        """
+        ranked = "$text" in filters
+        sort = [("score", {"$meta": "textScore"})] if ranked else KeysetPagination.SORT
+        if facets or include_total == "true" or (include_total == "estimated" and filters):
+            pipeline = [{"$match": filters}]
+            if ranked:
+                pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+                pipeline.append({"$sort": {"score": -1, "_id": 1}})
+            else:
+                pipeline.append({"$sort": dict(KeysetPagination.SORT)})
+            page_stages = [{"$skip": skip}, {"$limit": limit}]
+            if projection:
+                # An exclusion projection keeps score already; inclusion must name it
+                inclusion = any(projection.values())
+                page_stages.append({"$project": {**projection, "score": 1} if ranked and inclusion else projection})
+            pipeline.append({"$facet": {
+                **(facets or {}),
+                "items": page_stages,
+                "total": [{"$count": "count"}]
+            }})
+            with index_advisor.track(filters, sort):
+                result = await collection.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+            items = result[0].pop("items")
+            counted = result[0].pop("total")
+            total = counted[0]["count"] if counted else 0
+            return items, total, skip + len(items) < total, result[0]
+        
+        total = None
+        if include_total == "estimated":
+            total = await collection.estimated_document_count()
+        if ranked:
+            results = collection.find(filters, {**(projection or {}), "score": {"$meta": "textScore"}})
+        else:
+            results = collection.find(filters, projection)
+        # One extra item tells whether another page follows
+        with index_advisor.track(filters, sort):
+            items = await results.sort(sort).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+        return items[:limit], total, len(items) > limit, {}
+
+class ETagHelper:
+    """Helper for strong ETags and If-None-Match checks"""
+    
+    @staticmethod
+    def make_etag(*parts: Any) -> str:
+        digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+        return f'"{digest[:32]}"'
+    
+    @staticmethod
+    def document_etag(document_id: Any, updated_at: Optional[datetime]) -> str:
+        """ETag of one document; every write through the API moves updated_at"""
+        return ETagHelper.make_etag(document_id, updated_at.isoformat() if updated_at else None)
+    
+    @staticmethod
+    def list_etag(count: int, latest: Optional[datetime]) -> str:
+        """ETag of a whole collection: inserts and deletes change the count, updates the latest updated_at"""
+        return ETagHelper.make_etag(count, latest.isoformat() if latest else None)
+    
+    @staticmethod
+    def matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Whether an If-None-Match header names this ETag (weak comparison, as RFC 9110 requires)"""
+        if not if_none_match:
+            return False
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*" or candidate.removeprefix("W/") == etag:
+                return True
+        return False
 
 class ValidationHelper:
     """Helper for data validation"""
@@ -89,3 +306,62 @@ class ValidationHelper:
         text = text.strip()
         text = text[:max_length]
         return text
+
+def normalize_for_fingerprint(value: Any) -> str:
+    """Case-fold, NFKC-normalize and collapse whitespace"""
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKC", str(value)).casefold()
+    return " ".join(text.split())
+
+def question_fingerprint(question: Dict[str, Any]) -> str:
+    """Content hash identifying a question regardless of formatting or option order"""
+    canonical = [
+        normalize_for_fingerprint(question.get("text")),
+        sorted(normalize_for_fingerprint(option) for option in question.get("options") or []),
+        normalize_for_fingerprint(question.get("correct_answer")),
+        str(question.get("category_id") or ""),
+        str(question.get("source_id") or "")
+    ]
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()
+
+def apply_set(document: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of document with a $set of (possibly dotted) field paths applied
+    
+    Only the containers along each path are copied. A path MongoDB would reject
+    (e.g. a non-numeric step into an array) is skipped; the write reports it.
+    """
+    result = dict(document)
+    for path, value in changes.items():
+        *parents, leaf = path.split(".")
+        target = result
+        for part in parents:
+            child = _path_get(target, part)
+            if isinstance(child, dict):
+                child = dict(child)
+            elif isinstance(child, list):
+                child = list(child)
+            else:
+                child = {}
+            if not _path_set(target, part, child):
+                break
+            target = child
+        else:
+            _path_set(target, leaf, value)
+    return result
+
+def _path_get(container: Any, part: str) -> Any:
+    if isinstance(container, list):
+        return container[int(part)] if part.isdigit() and int(part) < len(container) else None
+    return container.get(part)
+
+def _path_set(container: Any, part: str, value: Any) -> bool:
+    if isinstance(container, list):
+        if not part.isdigit():
+            return False
+        index = int(part)
+        container.extend([None] * (index + 1 - len(container)))
+        container[index] = value
+    else:
+        container[part] = value
+    return True
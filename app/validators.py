@@ -1,6 +1,12 @@
 from pydantic import BaseModel, field_validator, ValidationError
-from typing import List, Optional, Dict, Any
-from app.utils import ValidationHelper
+from typing import List, Optional, Dict, Any, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.config import VALIDATION_WORKERS, VALIDATION_INLINE_ROWS
+from app.models import QuestionCreate
+from app.utils import ValidationHelper, question_fingerprint
+import asyncio
+import multiprocessing
 
 class QuestionValidator:
     """Validation logic for questions"""
@@ -92,3 +98,77 @@ class SourceValidator:
         if year and (year < 1900 or year > 2100):
             raise ValueError("Invalid year")
         return year
+
+def validate_question_rows(
+    rows: List[Tuple[int, Any]]
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """Validate raw (row, data) pairs the way create_question does
+    
+    Returns the normalized documents and per-row errors. Module-level so it
+    can run in a ValidationPool worker process.
+    """
+    documents = []
+    errors = []
+    for idx, data in rows:
+        try:
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
+            question = QuestionCreate(**data)
+            document = question.dict()
+            document["text"] = QuestionValidator.validate_question_text(question.text)
+            if question.options:
+                QuestionValidator.validate_options(question.options)
+            document["correct_answer"] = QuestionValidator.validate_correct_answer(
+                question.correct_answer, question.options
+            )
+            QuestionValidator.validate_metadata(document["metadata"])
+            document["fingerprint"] = question_fingerprint(document)
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )
+            errors.append({"row": idx, "error": message})
+            continue
+        except (ValueError, TypeError) as e:
+            errors.append({"row": idx, "error": str(e)})
+            continue
+        documents.append((idx, document))
+    return documents, errors
+
+class ValidationPool:
+    """Runs validate_question_rows in a process pool off the event loop"""
+    
+    def __init__(self, max_workers: int = VALIDATION_WORKERS, inline_rows: int = VALIDATION_INLINE_ROWS):
+        self.max_workers = max_workers
+        self.inline_rows = inline_rows
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    async def validate(
+        self,
+        rows: List[Tuple[int, Any]]
+    ) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+        """Validate rows; tiny chunks are cheaper to check inline than to ship"""
+        if self.max_workers < 1 or len(rows) < self.inline_rows:
+            return validate_question_rows(rows)
+        if self._executor is None:
+            # Fresh interpreters: forking a process running an event loop and
+            # driver threads can copy locks held by those threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, validate_question_rows, rows)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool next time and finish this chunk inline
+            self.shutdown()
+            return validate_question_rows(rows)
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+validation_pool = ValidationPool()
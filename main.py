@@ -4,8 +4,13 @@ from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from motor.motor_asyncio import AsyncIOMotorClient
 import logging
-from app.routes import questions, categories, sources, bulk, events
+from app.routes import questions, categories, sources, bulk, events, search, exams
 from app.middleware import ErrorHandlingMiddleware, RequestLoggingMiddleware
+from app.jobs import job_runner
+from app.validators import validation_pool
+from app.search_index import search_index
+from app.statistics import stats_reconciler
+from app.cache import question_cache_invalidator
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,28 +21,46 @@ client: AsyncIOMotorClient = None
 async def lifespan(app: FastAPI):
     # Startup
     global client
-    from app.config import MONGODB_URL, DB_NAME
+    from app.config import MONGODB_URL, DB_NAME, SEARCH_INDEX_ENABLED, QUESTION_CACHE_CHANGE_STREAM
     try:
         client = AsyncIOMotorClient(MONGODB_URL)
         app.db = client[DB_NAME]
         await create_indexes(app.db)
         logger.info("MongoDB connected and indexes created")
+        if SEARCH_INDEX_ENABLED:
+            await search_index.load(app.db)
+        stats_reconciler.start(app.db)
+        job_runner.start(app.db)
+        if QUESTION_CACHE_CHANGE_STREAM:
+            question_cache_invalidator.start(app.db)
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
         raise
     yield
     # Shutdown
+    await stats_reconciler.stop()
+    await question_cache_invalidator.stop()
+    await job_runner.shutdown()
+    validation_pool.shutdown()
     if client:
         client.close()
         logger.info("MongoDB disconnected")
 
 async def create_indexes(db):
     """Create database indexes"""
+    from app.config import IMPORT_CHECKPOINT_TTL
     questions_col = db["questions"]
     await questions_col.create_index("category_id")
     await questions_col.create_index("source_id")
     await questions_col.create_index([("metadata.difficulty", 1)])
     await questions_col.create_index([("created_at", -1)])
+    await questions_col.create_index([("created_at", 1), ("_id", 1)])
+    await questions_col.create_index("fingerprint", unique=True, sparse=True)
+    await questions_col.create_index(
+        [("text", "text"), ("explanation", "text"), ("metadata.tags", "text")],
+        weights={"text": 10, "metadata.tags": 5, "explanation": 2},
+        name="questions_text"
+    )
     
     idempotency_col = db["idempotency_keys"]
     await idempotency_col.create_index("idempotency_key", unique=True)
@@ -47,6 +70,19 @@ async def create_indexes(db):
     await events_col.create_index([("created_at", -1)])
     await events_col.create_index("entity_id")
     
+    jobs_col = db["jobs"]
+    await jobs_col.create_index([("created_at", -1)])
+    await jobs_col.create_index([("status", 1), ("heartbeat_at", 1)])
+    
+    checkpoints_col = db["import_checkpoints"]
+    # The checkpoint key now includes on_duplicate; drop the narrower unique index
+    if "upload_hash_1_format_1" in await checkpoints_col.index_information():
+        await checkpoints_col.drop_index("upload_hash_1_format_1")
+    await checkpoints_col.create_index(
+        [("upload_hash", 1), ("format", 1), ("on_duplicate", 1)], unique=True
+    )
+    await checkpoints_col.create_index("created_at", expireAfterSeconds=IMPORT_CHECKPOINT_TTL)
+    
     logger.info("Indexes created successfully")
 
 app = FastAPI(
@@ -72,6 +108,8 @@ app.include_router(categories.router, prefix="/api/v1/categories", tags=["catego
 app.include_router(sources.router, prefix="/api/v1/sources", tags=["sources"])
 app.include_router(bulk.router, prefix="/api/v1/bulk", tags=["bulk operations"])
 app.include_router(events.router, prefix="/api/v1/events", tags=["events"])
+app.include_router(search.router, prefix="/api/v1/search", tags=["search"])
+app.include_router(exams.router, prefix="/api/v1/exams", tags=["exams"])
 
 @app.get("/health")
 async def health_check():
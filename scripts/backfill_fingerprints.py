@@ -0,0 +1,66 @@
+"""
+Backfill content fingerprints on questions stored before deduplication
+Run: python -m scripts.backfill_fingerprints
+
+Questions whose content duplicates an already fingerprinted question are
+left without a fingerprint and reported so they can be reviewed.
+"""
+
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import MONGODB_URL, DB_NAME, BULK_WRITE_BATCH_SIZE
+from app.utils import FINGERPRINT_FIELDS, question_fingerprint
+
+async def flush(collection, question_ids: list, fingerprints: list) -> tuple:
+    """Write one batch of fingerprints; returns (updated, duplicate ids)"""
+    operations = [
+        UpdateOne({"_id": question_id}, {"$set": {"fingerprint": fingerprint}})
+        for question_id, fingerprint in zip(question_ids, fingerprints)
+    ]
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+        return result.modified_count, []
+    except BulkWriteError as e:
+        duplicates = [
+            question_ids[error["index"]]
+            for error in e.details.get("writeErrors", [])
+            if error.get("code") == 11000
+        ]
+        return e.details.get("nModified", 0), duplicates
+
+async def backfill_fingerprints():
+    client = AsyncIOMotorClient(MONGODB_URL)
+    collection = client[DB_NAME]["questions"]
+    
+    updated = 0
+    duplicates = []
+    question_ids = []
+    fingerprints = []
+    cursor = collection.find(
+        {"fingerprint": {"$exists": False}},
+        {field: 1 for field in FINGERPRINT_FIELDS}
+    )
+    async for question in cursor:
+        question_ids.append(question["_id"])
+        fingerprints.append(question_fingerprint(question))
+        if len(question_ids) >= BULK_WRITE_BATCH_SIZE:
+            count, dupes = await flush(collection, question_ids, fingerprints)
+            updated += count
+            duplicates.extend(dupes)
+            question_ids, fingerprints = [], []
+    if question_ids:
+        count, dupes = await flush(collection, question_ids, fingerprints)
+        updated += count
+        duplicates.extend(dupes)
+    
+    print(f"Fingerprinted {updated} questions")
+    if duplicates:
+        print(f"{len(duplicates)} duplicate questions left without a fingerprint:")
+        for question_id in duplicates:
+            print(f"  {question_id}")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(backfill_fingerprints())
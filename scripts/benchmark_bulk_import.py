@@ -0,0 +1,69 @@
+"""
+Bulk import benchmark: per-row inserts vs batched insert_many
+Run: python -m scripts.benchmark_bulk_import [rows]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import MONGODB_URL, DB_NAME, MAX_BULK_SIZE
+from app.events import EventService, EventType
+from app.services.bulk_service import BulkService
+
+BENCH_DB_NAME = f"{DB_NAME}_bench"
+
+def make_rows(count: int) -> list:
+    """Generate synthetic question rows"""
+    return [
+        {
+            "text": f"Benchmark question {i}?",
+            "category_id": f"cat_{i % 10}",
+            "source_id": f"src_{i % 5}",
+            "type": "multiple_choice",
+            "options": ["A", "B", "C", "D"],
+            "correct_answer": "A",
+            "explanation": "Generated for benchmarking",
+            "metadata": {"difficulty": "medium", "tags": ["bench"]}
+        }
+        for i in range(count)
+    ]
+
+async def per_row_import(db, questions_data: list) -> dict:
+    """The previous implementation: one insert_one and one log_event per row"""
+    event_service = EventService(db)
+    imported = 0
+    for question_data in questions_data:
+        question_data["created_at"] = datetime.utcnow()
+        question_data["updated_at"] = datetime.utcnow()
+        result = await db["questions"].insert_one(question_data)
+        await event_service.log_event(EventType.BULK_IMPORT, str(result.inserted_id), "Question")
+        imported += 1
+    return {"imported": imported}
+
+async def timed(label: str, db, runner, rows: int) -> float:
+    """Run one import against a clean database and print rows/sec"""
+    await db["questions"].delete_many({})
+    await db["events"].delete_many({})
+    start = time.perf_counter()
+    result = await runner(make_rows(rows))
+    elapsed = time.perf_counter() - start
+    rate = result["imported"] / elapsed if elapsed else float("inf")
+    print(f"{label:<12} {result['imported']:>6} rows in {elapsed:8.3f}s  {rate:10.1f} rows/sec")
+    return rate
+
+async def run_benchmark(rows: int):
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[BENCH_DB_NAME]
+    try:
+        before = await timed("per-row", db, lambda data: per_row_import(db, data), rows)
+        after = await timed("batched", db, BulkService(db).bulk_import, rows)
+        print(f"Speedup: {after / before:.1f}x")
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+if __name__ == "__main__":
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else MAX_BULK_SIZE
+    asyncio.run(run_benchmark(row_count))
@@ -0,0 +1,62 @@
+"""
+Question listing benchmark: response-model validation vs direct orjson encoding
+Run: python -m scripts.benchmark_list_serialization [requests]
+"""
+
+import asyncio
+import sys
+import time
+import httpx
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import MONGODB_URL, DB_NAME
+from app.routes import questions as question_routes
+from app.utils import question_fingerprint
+from main import app
+from scripts.benchmark_bulk_import import make_rows
+
+BENCH_DB_NAME = f"{DB_NAME}_bench"
+PAGE_SIZE = 100
+
+async def seed(db, count: int) -> None:
+    """Store questions shaped like the ones created through the API"""
+    await db["questions"].delete_many({})
+    rows = make_rows(count)
+    for row in rows:
+        row["created_at"] = row["updated_at"] = datetime.utcnow()
+        row["metadata"].update({"time_limit_seconds": 60, "passing_score": None, "is_active": True})
+        row["fingerprint"] = question_fingerprint(row)
+    await db["questions"].insert_many(rows)
+
+async def timed(label: str, client: httpx.AsyncClient, validate: bool, requests: int) -> float:
+    """Request 100-item pages with one serialization path and print requests/sec"""
+    question_routes.VALIDATE_RESPONSES = validate
+    url = f"/api/v1/questions/?page_size={PAGE_SIZE}&include_total=false"
+    response = await client.get(url)
+    response.raise_for_status()
+    assert len(response.json()["items"]) == PAGE_SIZE
+    
+    start = time.perf_counter()
+    for _ in range(requests):
+        (await client.get(url)).raise_for_status()
+    elapsed = time.perf_counter() - start
+    rate = requests / elapsed if elapsed else float("inf")
+    print(f"{label:<10} {requests:>6} pages in {elapsed:8.3f}s  {rate:10.1f} requests/sec")
+    return rate
+
+async def run_benchmark(requests: int):
+    client = AsyncIOMotorClient(MONGODB_URL)
+    app.db = client[BENCH_DB_NAME]
+    try:
+        await seed(app.db, PAGE_SIZE)
+        async with httpx.AsyncClient(app=app, base_url="http://bench") as http:
+            before = await timed("validated", http, True, requests)
+            after = await timed("orjson", http, False, requests)
+        print(f"Speedup: {after / before:.1f}x")
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+if __name__ == "__main__":
+    request_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    asyncio.run(run_benchmark(request_count))
@@ -1,7 +1,10 @@
 import pytest
 import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi.testclient import TestClient
 from app.config import MONGODB_URL, DB_NAME
+from main import app
+from app.cache import question_cache, search_cache
 
 @pytest.fixture
 async def test_db():
@@ -14,9 +17,26 @@ async def test_db():
     await client.drop_database(f"{DB_NAME}_test")
     client.close()
 
+@pytest.fixture(autouse=True)
+def reset_caches():
+    """Tests write to the database directly, which does not invalidate the caches"""
+    search_cache.bump_epoch()
+    question_cache.clear()
+    yield
+
 @pytest.fixture
 def event_loop():
     """Create event loop for async tests"""
     loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
+
+@pytest.fixture
+def api_client(monkeypatch):
+    """A TestClient whose app lifespan connects to a throwaway test database"""
+    db_name = f"{DB_NAME}_api_test"
+    monkeypatch.setattr("app.config.DB_NAME", db_name)
+    with TestClient(app) as client:
+        yield client
+        # Drop through the app's own client, on the loop the app runs on
+        client.portal.call(app.db.client.drop_database, db_name)
@@ -1,9 +1,41 @@
 import pytest
+import json
+import time
 from fastapi.testclient import TestClient
+from app.config import MAX_BATCH_GET_IDS
 from main import app
 
 client = TestClient(app)
 
+def ndjson_upload(rows):
+    body = "\n".join(json.dumps(row) for row in rows).encode()
+    return {"file": ("questions.ndjson", body, "application/x-ndjson")}
+
+def sample_questions(count):
+    difficulties = ["easy", "medium", "hard"]
+    return [
+        {
+            "text": f"Q {i}",
+            "category_id": "cat_1",
+            "source_id": "src_1",
+            "correct_answer": "A",
+            "options": ["A", "B"],
+            "metadata": {"difficulty": difficulties[i % 3], "tags": [f"tag_{i % 4}"]}
+        }
+        for i in range(count)
+    ]
+
+def export_questions(api_client):
+    """Every stored question, read back through the NDJSON export"""
+    response = api_client.post("/api/v1/bulk/export/json", params={"format": "ndjson"})
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def seed_questions(api_client, count):
+    """Import questions through the API and return them as exported"""
+    response = api_client.post("/api/v1/bulk/import/ndjson", files=ndjson_upload(sample_questions(count)))
+    assert response.status_code == 201
+    return export_questions(api_client)
+
 def test_health_check():
     """Test health check endpoint"""
     response = client.get("/health")
@@ -43,3 +75,134 @@ async def test_invalid_question_data(test_db):
     }
     
     # Test would validate the error response
+
+def test_import_ndjson_endpoint(api_client):
+    """Test NDJSON import reports imported rows and per-line errors"""
+    rows = sample_questions(3)
+    body = b"\n".join(json.dumps(row).encode() for row in rows) + b"\n{not json}\n"
+    
+    response = api_client.post(
+        "/api/v1/bulk/import/ndjson",
+        files={"file": ("questions.ndjson", body, "application/x-ndjson")}
+    )
+    
+    assert response.status_code == 201
+    result = response.json()
+    assert result["total_imported"] == 3
+    assert result["total_failed"] == 1
+    assert result["errors"][0]["row"] == 3
+
+def test_export_streams_json_and_gzipped_ndjson(api_client):
+    """Test streamed export in both formats, with gzip content encoding"""
+    seed_questions(api_client, 3)
+    
+    response = api_client.post("/api/v1/bulk/export/json", params={"category_id": "cat_1"})
+    assert response.status_code == 200
+    assert response.json()["count"] == 3
+    
+    response = api_client.post("/api/v1/bulk/export/json", params={"format": "ndjson", "gzip": "true"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["text"] for row in rows) == ["Q 0", "Q 1", "Q 2"]
+
+def wait_for_job(api_client, job_id):
+    for _ in range(100):
+        job = api_client.get(f"/api/v1/bulk/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("Job did not finish")
+
+def test_background_import_and_delete_jobs(api_client):
+    """Test queued jobs run in the background and report their counts"""
+    response = api_client.post("/api/v1/bulk/jobs/import/ndjson", files=ndjson_upload(sample_questions(4)))
+    assert response.status_code == 202
+    job = wait_for_job(api_client, response.json()["job_id"])
+    assert job["status"] == "completed"
+    assert job["succeeded"] == 4
+    
+    ids = [row["_id"] for row in export_questions(api_client)]
+    response = api_client.post("/api/v1/bulk/jobs/delete", json=ids)
+    assert response.status_code == 202
+    job = wait_for_job(api_client, response.json()["job_id"])
+    assert job["status"] == "completed"
+    assert job["succeeded"] == 4
+    
+    assert api_client.get("/api/v1/bulk/jobs/000000000000000000000000").status_code == 404
+    assert api_client.get("/api/v1/bulk/jobs/not-an-id").status_code == 400
+
+def test_assemble_exam_endpoint(api_client):
+    """Test exam assembly honours quotas and rejects impossible ones"""
+    seed_questions(api_client, 12)
+    
+    response = api_client.post("/api/v1/exams/assemble", json={
+        "total_questions": 4,
+        "difficulty": {"easy": 2, "hard": 2},
+        "max_per_tag": 2
+    })
+    assert response.status_code == 200
+    exam = response.json()
+    assert exam["total"] == 4
+    assert exam["summary"]["by_difficulty"] == {"easy": 2, "hard": 2}
+    
+    response = api_client.post("/api/v1/exams/assemble", json={
+        "total_questions": 2,
+        "difficulty": {"easy": 3}
+    })
+    assert response.status_code == 400
+
+def test_batch_get_endpoint(api_client):
+    """Test batch-get keeps request order, reports missing ids and enforces its limits"""
+    ids = [row["_id"] for row in seed_questions(api_client, 3)]
+    missing = "507f1f77bcf86cd799439011"
+    
+    response = api_client.post("/api/v1/questions/batch-get", json={"ids": [ids[2], missing, ids[0]]})
+    assert response.status_code == 200
+    batch = response.json()
+    assert [item["_id"] for item in batch["items"]] == [ids[2], ids[0]]
+    assert batch["missing"] == [missing]
+    
+    response = api_client.post("/api/v1/questions/batch-get", json={"ids": [ids[0]], "fields": ["text"]})
+    assert set(response.json()["items"][0]) == {"_id", "text"}
+    
+    assert api_client.post("/api/v1/questions/batch-get", json={"ids": ["bad-id"]}).status_code == 400
+    too_many = {"ids": [missing] * (MAX_BATCH_GET_IDS + 1)}
+    assert api_client.post("/api/v1/questions/batch-get", json=too_many).status_code == 422
+
+def test_conditional_get_with_etags(api_client):
+    """Test If-None-Match returns 304 until the resource changes"""
+    question_id = seed_questions(api_client, 1)[0]["_id"]
+    url = f"/api/v1/questions/{question_id}"
+    
+    response = api_client.get(url)
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+    assert api_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    
+    assert api_client.put(url, json={"explanation": "Because"}).status_code == 200
+    response = api_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    
+    assert api_client.post("/api/v1/categories/", json={"name": "Science"}).status_code == 201
+    response = api_client.get("/api/v1/categories/")
+    etag = response.headers["etag"]
+    assert api_client.get("/api/v1/categories/", headers={"If-None-Match": etag}).status_code == 304
+
+def test_fields_projection(api_client):
+    """Test fields= trims listings and exports, and rejects unknown fields"""
+    seed_questions(api_client, 2)
+    
+    response = api_client.get("/api/v1/questions/", params={"fields": "text,metadata.difficulty"})
+    assert response.status_code == 200
+    for item in response.json()["items"]:
+        assert set(item) == {"_id", "text", "metadata", "created_at"}
+        assert set(item["metadata"]) == {"difficulty"}
+    
+    response = api_client.post("/api/v1/bulk/export/json", params={"format": "ndjson", "fields": "text"})
+    assert [set(json.loads(line)) for line in response.text.splitlines()] == [{"_id", "text"}] * 2
+    
+    assert api_client.get("/api/v1/questions/", params={"fields": "fingerprint"}).status_code == 400
+    assert api_client.post("/api/v1/bulk/export/json", params={"fields": "password"}).status_code == 400
@@ -1,5 +1,11 @@
 import pytest
-from app.services.bulk_service import BulkService
+import asyncio
+import json
+from bson import ObjectId
+from app.services.bulk_service import BulkService, _merge_streams
+from app.config import BULK_BATCH_SIZE
+from app.streaming import InvalidRow
+from app.utils import question_fingerprint
 
 @pytest.mark.asyncio
 async def test_bulk_import(test_db):
@@ -46,6 +52,261 @@ async def test_bulk_export(test_db):
     await service.bulk_import(questions)
     
     # Export
-    data = await service.bulk_export({"category_id": "cat_1"})
+    body = b"".join([chunk async for chunk in service.stream_export({"category_id": "cat_1"})])
     
-    assert len(data) >= 1
+    assert len(json.loads(body)["data"]) >= 1
+
+@pytest.mark.asyncio
+async def test_bulk_import_reports_row_errors_across_batches(test_db):
+    """Test batched import keeps per-row error positions"""
+    service = BulkService(test_db)
+    
+    questions = [
+        {
+            "text": f"Batch question {i}",
+            "category_id": "cat_1",
+            "source_id": "src_1",
+            "correct_answer": "A"
+        }
+        for i in range(BULK_BATCH_SIZE + 5)
+    ]
+    questions[3] = "not a question"
+    questions[BULK_BATCH_SIZE + 1] = "not a question either"
+    
+    result = await service.bulk_import(questions)
+    
+    assert result["imported"] == BULK_BATCH_SIZE + 3
+    assert result["failed"] == 2
+    assert [e["row"] for e in result["errors"]] == [3, BULK_BATCH_SIZE + 1]
+    assert await test_db["questions"].count_documents({}) == BULK_BATCH_SIZE + 3
+    assert await test_db["events"].count_documents({"event_type": "bulk.import"}) == BULK_BATCH_SIZE + 3
+
+@pytest.mark.asyncio
+async def test_bulk_import_stream(test_db):
+    """Test streamed import batches rows and reports bad ones"""
+    service = BulkService(test_db)
+    
+    async def rows():
+        for i in range(BULK_BATCH_SIZE + 1):
+            yield {"text": f"Streamed {i}", "category_id": "cat_1", "source_id": "src_1", "correct_answer": "A"}
+        yield InvalidRow("Invalid JSON")
+    
+    result = await service.bulk_import_stream(rows())
+    
+    assert result["imported"] == BULK_BATCH_SIZE + 1
+    assert result["failed"] == 1
+    assert result["errors"][0]["row"] == BULK_BATCH_SIZE + 1
+
+@pytest.mark.asyncio
+async def test_stream_export(test_db):
+    """Test streamed export in JSON and NDJSON formats"""
+    service = BulkService(test_db)
+    await service.bulk_import([
+        {"text": f"Export {i}", "category_id": "cat_2", "source_id": "src_1", "correct_answer": "A"}
+        for i in range(3)
+    ])
+    
+    body = b"".join([chunk async for chunk in service.stream_export({"category_id": "cat_2"})])
+    data = json.loads(body)
+    assert data["count"] == 3
+    assert isinstance(data["data"][0]["_id"], str)
+    assert "fingerprint" not in data["data"][0]
+    
+    body = b"".join([chunk async for chunk in service.stream_export({"category_id": "cat_2"}, "ndjson")])
+    assert len(body.splitlines()) == 3
+    assert "fingerprint" not in json.loads(body.splitlines()[0])
+
+@pytest.mark.asyncio
+async def test_merge_streams_closes_sources_when_abandoned():
+    """Test closing a merged stream early stops every pump and closes its source"""
+    closed = []
+    
+    async def source(name):
+        try:
+            for i in range(1000):
+                yield name, i
+        finally:
+            closed.append(name)
+    
+    merged = _merge_streams([source("a"), source("b"), source("c")])
+    assert (await merged.__anext__())[0] in "abc"
+    # Let the pumps fill the queue and block on it
+    await asyncio.sleep(0.01)
+    await asyncio.wait_for(merged.aclose(), timeout=1)
+    
+    assert sorted(closed) == ["a", "b", "c"]
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+
+@pytest.mark.asyncio
+async def test_bulk_update(test_db):
+    """Test grouped bulk update keeps per-row results and last-write-wins order"""
+    service = BulkService(test_db)
+    await service.bulk_import([
+        {"text": f"Update {i}", "category_id": "cat_1", "source_id": "src_1", "correct_answer": "A"}
+        for i in range(3)
+    ])
+    ids = [str(q["_id"]) for q in await test_db["questions"].find().sort("text", 1).to_list(None)]
+    
+    result = await service.bulk_update([
+        {"id": ids[0], "explanation": "shared"},
+        {"id": ids[1], "explanation": "shared"},
+        {"id": ids[2], "explanation": "first"},
+        {"id": ids[2], "explanation": "second"},
+        {"id": "000000000000000000000000", "explanation": "missing"},
+        {"explanation": "no id"}
+    ])
+    
+    assert result["updated"] == 4
+    assert result["failed"] == 2
+    assert [e["row"] for e in result["errors"]] == [4, 5]
+    assert await test_db["questions"].count_documents({"explanation": "shared"}) == 2
+    last = await test_db["questions"].find_one({"_id": ObjectId(ids[2])})
+    assert last["explanation"] == "second"
+
+@pytest.mark.asyncio
+async def test_bulk_update_dotted_paths(test_db):
+    """Test dotted keys re-fingerprint, move statistics and leave the caller's rows intact"""
+    service = BulkService(test_db)
+    await service.bulk_import([{
+        "text": "Dotted", "category_id": "cat_1", "source_id": "src_1",
+        "options": ["3", "4"], "correct_answer": "4", "metadata": {"difficulty": "easy"}
+    }])
+    question = await test_db["questions"].find_one({"text": "Dotted"})
+    await service.stats_service.reconcile()
+    rows = [{"id": str(question["_id"]), "metadata.difficulty": "hard", "options.1": "5"}]
+    
+    result = await service.bulk_update(rows)
+    
+    assert result["updated"] == 1
+    assert rows[0]["id"] == str(question["_id"])
+    updated = await test_db["questions"].find_one({"_id": question["_id"]})
+    assert updated["options"] == ["3", "5"]
+    assert updated["fingerprint"] == question_fingerprint(updated)
+    stats = await service.stats_service.get_statistics()
+    assert stats["by_difficulty"] == {"hard": 1}
+
+@pytest.mark.asyncio
+async def test_bulk_delete(test_db):
+    """Test set-based delete counts invalid, missing and repeated ids as failed"""
+    service = BulkService(test_db)
+    await service.bulk_import([
+        {"text": f"Delete {i}", "category_id": "cat_1", "source_id": "src_1", "correct_answer": "A"}
+        for i in range(3)
+    ])
+    ids = [str(q["_id"]) for q in await test_db["questions"].find().to_list(None)]
+    
+    result = await service.bulk_delete(ids[:2] + [ids[0], "not-an-id", "000000000000000000000000"])
+    
+    assert result == {"deleted": 2, "failed": 3}
+    assert await test_db["questions"].count_documents({}) == 1
+    assert await test_db["events"].count_documents({"event_type": "question.deleted"}) == 2
+
+@pytest.mark.asyncio
+async def test_import_resumes_from_checkpoint(test_db):
+    """Test a retried upload skips the batches committed before the interruption"""
+    service = BulkService(test_db)
+    questions = [
+        {"text": f"Resume {i}", "category_id": "cat_1", "source_id": "src_1", "correct_answer": "A"}
+        for i in range(BULK_BATCH_SIZE * 2 + 10)
+    ]
+    
+    async def rows():
+        for question in questions:
+            yield dict(question)
+    
+    # Commit the first batch, then abandon the import as if the worker died
+    batches = service.import_batches(rows(), "upload-hash", "json")
+    first = await batches.__anext__()
+    assert first["succeeded"] == BULK_BATCH_SIZE
+    await batches.aclose()
+    
+    result = await service.bulk_import_stream(rows(), "upload-hash", "json")
+    
+    assert result["imported"] == len(questions)
+    assert await test_db["questions"].count_documents({}) == len(questions)
+    
+    # A completed upload is checked again rather than replayed from its checkpoint
+    again = await service.bulk_import_stream(rows(), "upload-hash", "json")
+    assert again["imported"] == 0
+    assert again["duplicates"] == len(questions)
+    assert await test_db["questions"].count_documents({}) == len(questions)
+
+@pytest.mark.asyncio
+async def test_import_reruns_after_completed_checkpoint(test_db):
+    """Test a finished upload is imported again once its questions are gone"""
+    service = BulkService(test_db)
+    questions = [
+        {"text": f"Rerun {i}", "category_id": "cat_1", "source_id": "src_1", "correct_answer": "A"}
+        for i in range(BULK_BATCH_SIZE + 10)
+    ]
+    
+    async def rows():
+        for question in questions:
+            yield dict(question)
+    
+    first = await service.bulk_import_stream(rows(), "upload-hash", "json")
+    assert first["imported"] == len(questions)
+    
+    await test_db["questions"].delete_many({})
+    again = await service.bulk_import_stream(rows(), "upload-hash", "json")
+    assert again["imported"] == len(questions)
+    assert await test_db["questions"].count_documents({}) == len(questions)
+
+@pytest.mark.asyncio
+async def test_import_checkpoint_is_keyed_by_on_duplicate(test_db):
+    """Test an interrupted upload is not resumed under a different on_duplicate"""
+    service = BulkService(test_db)
+    questions = [
+        {"text": f"Mode {i}", "category_id": "cat_1", "source_id": "src_1", "correct_answer": "A"}
+        for i in range(BULK_BATCH_SIZE * 2)
+    ]
+    
+    async def rows():
+        for question in questions:
+            yield dict(question)
+    
+    batches = service.import_batches(rows(), "upload-hash", "json")
+    await batches.__anext__()
+    await batches.aclose()
+    
+    result = await service.bulk_import_stream(rows(), "upload-hash", "json", on_duplicate="upsert")
+    
+    # Every row is processed again: the committed batch is upserted, the rest inserted
+    assert result["duplicates"] == BULK_BATCH_SIZE
+    assert result["imported"] == len(questions) - BULK_BATCH_SIZE
+    assert await test_db["questions"].count_documents({}) == len(questions)
+
+@pytest.mark.asyncio
+async def test_bulk_import_reports_duplicates(test_db):
+    """Test rows with the same content are skipped or upserted, not failed"""
+    service = BulkService(test_db)
+    question = {"text": "Dup?", "category_id": "cat_1", "source_id": "src_1", "options": ["A", "B"], "correct_answer": "A"}
+    
+    result = await service.bulk_import([dict(question), dict(question, text="  dup? ", options=["B", "A"])])
+    assert result["imported"] == 1
+    assert result["duplicates"] == 1
+    assert result["failed"] == 0
+    
+    result = await service.bulk_import([dict(question, explanation="Updated")], on_duplicate="upsert")
+    assert result["imported"] == 0
+    assert result["duplicates"] == 1
+    stored = await test_db["questions"].find({}).to_list(None)
+    assert len(stored) == 1
+    assert stored[0]["explanation"] == "Updated"
+
+@pytest.mark.asyncio
+async def test_partitioned_export_covers_every_question(test_db):
+    """Test concurrent _id-range export returns each question exactly once"""
+    service = BulkService(test_db)
+    await test_db["questions"].insert_many([
+        {"text": f"Partition {i}", "category_id": "cat_3", "source_id": "src_1", "correct_answer": "A"}
+        for i in range(500)
+    ])
+    
+    body = b"".join([
+        chunk async for chunk in service.stream_export({"category_id": "cat_3"}, "json", partitions=4)
+    ])
+    data = json.loads(body)
+    
+    assert data["count"] == 500
+    assert len({q["_id"] for q in data["data"]}) == 500
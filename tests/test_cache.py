@@ -0,0 +1,85 @@
+from bson import ObjectId
+from app.cache import LRUCache, QuestionCache, QuestionCacheInvalidator, SearchResultCache
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+    
+    def test_entries_expire(self):
+        cache = LRUCache(max_entries=2, ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+    
+    def test_counts_hits_and_misses(self):
+        cache = LRUCache(max_entries=2, ttl=60)
+        cache.get("a")
+        cache.set("a", 1)
+        cache.get("a")
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    
+    def test_tracks_evictions_and_weight(self):
+        cache = LRUCache(max_entries=2, ttl=60, weigh=len)
+        cache.set("a", b"xx")
+        cache.set("a", b"xxx")
+        cache.set("b", b"y")
+        cache.set("c", b"zzzz")
+        stats = cache.stats()
+        assert (stats["evictions"], stats["bytes"]) == (1, 5)
+        cache.pop("b")
+        assert cache.stats()["bytes"] == 4
+
+class TestSearchResultCache:
+    def test_key_ignores_filter_order(self):
+        assert SearchResultCache.make_key({"a": 1, "b": 2}, 1) == SearchResultCache.make_key({"b": 2, "a": 1}, 1)
+    
+    def test_bump_epoch_invalidates(self):
+        cache = SearchResultCache(max_entries=10, ttl=60)
+        cache.set("k", {"total": 1}, cache.epoch)
+        assert cache.get("k") == {"total": 1}
+        cache.bump_epoch()
+        assert cache.get("k") is None
+    
+    def test_result_from_before_a_write_is_not_stored(self):
+        cache = SearchResultCache(max_entries=10, ttl=60)
+        epoch = cache.epoch
+        cache.bump_epoch()
+        cache.set("k", {"total": 1}, epoch)
+        assert cache.get("k") is None
+
+class TestQuestionCache:
+    def test_invalidate_drops_entry(self):
+        cache = QuestionCache(max_entries=10, ttl=60)
+        question_id = ObjectId()
+        cache.set(str(question_id), b"{}", '"etag"', cache.generation)
+        assert cache.get(str(question_id)) == (b"{}", '"etag"')
+        cache.invalidate(question_id)
+        assert cache.get(str(question_id)) is None
+    
+    def test_read_racing_a_write_is_not_stored(self):
+        cache = QuestionCache(max_entries=10, ttl=60)
+        generation = cache.generation
+        cache.invalidate("q1")
+        cache.set("q1", b"{}", '"etag"', generation)
+        assert cache.get("q1") is None
+    
+    def test_change_events_invalidate(self):
+        cache = QuestionCache(max_entries=10, ttl=60)
+        invalidator = QuestionCacheInvalidator(cache)
+        question_id = ObjectId()
+        for key in (str(question_id), "other"):
+            cache.set(key, b"{}", '"etag"', cache.generation)
+        invalidator.apply({"operationType": "insert", "documentKey": {"_id": ObjectId()}})
+        assert cache.stats()["size"] == 2
+        invalidator.apply({"operationType": "update", "documentKey": {"_id": question_id}})
+        assert cache.get(str(question_id)) is None
+        invalidator.apply({"operationType": "drop"})
+        assert cache.stats()["size"] == 0
@@ -0,0 +1,98 @@
+import pytest
+from app.models import ExamAssemblyRequest
+from app.services.exam_service import ExamService, solve_quotas
+
+def candidate(question_id, category_id="cat_1", tags=(), seconds=60):
+    return {
+        "_id": question_id,
+        "category_id": category_id,
+        "metadata": {"tags": list(tags), "time_limit_seconds": seconds}
+    }
+
+class TestSolveQuotas:
+    def test_fills_quotas_and_spreads_categories(self):
+        pools = {
+            "easy": [candidate(f"e{i}", f"cat_{i % 2}") for i in range(6)],
+            "hard": [candidate(f"h{i}", "cat_0") for i in range(3)] + [candidate("h9", "cat_2")]
+        }
+        picked, short = solve_quotas(pools, {"easy": 3, "hard": 2}, ["cat_0", "cat_1", "cat_2"])
+        assert short == {}
+        assert len(picked["easy"]) == 3
+        assert [c["_id"] for c in picked["hard"]] == ["h9", "h0"]
+
+    def test_respects_tag_cap(self):
+        pools = {None: [candidate(f"q{i}", tags=["algebra"] if i < 5 else ["geometry"]) for i in range(8)]}
+        picked, short = solve_quotas(pools, {None: 4}, max_per_tag=2)
+        assert short == {}
+        tags = [c["metadata"]["tags"][0] for c in picked[None]]
+        assert tags.count("algebra") == 2
+
+    def test_stays_within_time_budget(self):
+        pools = {None: [candidate("long", seconds=600)] + [candidate(f"q{i}", seconds=100) for i in range(3)]}
+        picked, short = solve_quotas(pools, {None: 3}, max_total_time=400)
+        assert short == {}
+        assert "long" not in [c["_id"] for c in picked[None]]
+
+    def test_reports_shortfall(self):
+        pools = {"hard": [candidate("h1", tags=["x"]), candidate("h2", tags=["x"])]}
+        picked, short = solve_quotas(pools, {"hard": 2}, max_per_tag=1)
+        assert len(picked["hard"]) == 1
+        assert short == {"hard": 1}
+
+class TestExamQuotas:
+    def test_quotas_must_add_up(self):
+        request = ExamAssemblyRequest(total_questions=5, difficulty={"easy": 2, "hard": 2})
+        with pytest.raises(ValueError):
+            ExamService._quotas(request)
+
+@pytest.mark.asyncio
+async def test_assemble_rejects_unmet_quota_after_retry(monkeypatch):
+    """A shortfall left after the larger resample is an error, not a short paper"""
+    sizes = []
+    
+    async def sample(self, filters, difficulty, size):
+        sizes.append(size)
+        return [candidate(f"q{i}", tags=["algebra"]) for i in range(size)]
+    
+    monkeypatch.setattr(ExamService, "_sample", sample)
+    request = ExamAssemblyRequest(total_questions=5, max_per_tag=2)
+    
+    with pytest.raises(ValueError, match="short: 3 any"):
+        await ExamService(None).assemble(request)
+    assert len(sizes) == 2
+
+@pytest.mark.asyncio
+async def test_assemble_exam(test_db):
+    """Quotas, tag cap and time budget hold, and full documents come back"""
+    questions = [
+        {
+            "text": f"Q{i}",
+            "category_id": f"cat_{i % 3}",
+            "source_id": "src_1",
+            "correct_answer": "A",
+            "metadata": {
+                "difficulty": ["easy", "medium", "hard"][i % 3],
+                "tags": [f"tag_{i % 10}"],
+                "time_limit_seconds": 60,
+                "is_active": True
+            },
+            "fingerprint": f"fp_{i}"
+        }
+        for i in range(90)
+    ]
+    await test_db["questions"].insert_many(questions)
+
+    service = ExamService(test_db)
+    result = await service.assemble(ExamAssemblyRequest(
+        total_questions=12,
+        difficulty={"easy": 4, "medium": 6, "hard": 2},
+        max_per_tag=2,
+        max_total_time_seconds=900
+    ))
+
+    assert result["total"] == 12
+    assert result["summary"]["by_difficulty"] == {"easy": 4, "medium": 6, "hard": 2}
+    assert max(result["summary"]["by_tag"].values()) <= 2
+    assert result["summary"]["total_time_seconds"] <= 900
+    assert all("text" in question for question in result["questions"])
+    assert all("fingerprint" not in question for question in result["questions"])
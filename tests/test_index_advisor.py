@@ -0,0 +1,98 @@
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from app.index_advisor import IndexAdvisor, propose_index, query_shape, summarize_plan
+from app.utils import KeysetPagination, SearchFilters
+
+class TestQueryShape:
+    def test_classifies_equality_sort_and_range(self):
+        filters = {
+            "category_id": "cat_1",
+            "metadata.tags": {"$in": ["a", "b"]},
+            "updated_at": {"$gte": datetime(2024, 1, 1)}
+        }
+        shape = query_shape(filters, KeysetPagination.SORT)
+        assert shape == {
+            "equality": ["category_id", "metadata.tags"],
+            "sort": [["created_at", 1], ["_id", 1]],
+            "range": ["updated_at"],
+            "unindexable": []
+        }
+    
+    def test_keyset_cursor_is_a_range_on_sort_fields(self):
+        item = {"_id": ObjectId(), "created_at": datetime(2024, 1, 1)}
+        filters = KeysetPagination.apply_cursor({"source_id": "s"}, KeysetPagination.encode_cursor(item))
+        shape = query_shape(filters, KeysetPagination.SORT)
+        assert shape["equality"] == ["source_id"]
+        assert shape["range"] == []
+    
+    def test_values_do_not_change_the_shape(self):
+        assert query_shape({"category_id": "a"}, []) == query_shape({"category_id": "b"}, [])
+    
+    def test_regex_fields_are_unindexable(self):
+        shape = query_shape(SearchFilters.build_text_search("x", "substring"), [])
+        assert shape["unindexable"] == ["explanation", "metadata.tags", "text"]
+
+class TestProposeIndex:
+    def test_esr_order(self):
+        shape = query_shape(
+            {"metadata.difficulty": "easy", "category_id": "c", "updated_at": {"$lt": datetime(2024, 1, 1)}},
+            KeysetPagination.SORT
+        )
+        assert propose_index(shape) == [
+            ("category_id", 1), ("metadata.difficulty", 1), ("created_at", 1), ("_id", 1), ("updated_at", 1)
+        ]
+    
+    def test_no_proposal_for_text_or_id_lookups(self):
+        assert propose_index(query_shape({"$text": {"$search": "x"}}, [])) is None
+        assert propose_index(query_shape({"_id": {"$in": [ObjectId()]}}, [])) is None
+
+class TestIndexAdvisor:
+    def test_counts_shapes_and_slow_queries(self):
+        advisor = IndexAdvisor(slow_ms=50)
+        advisor.record({"category_id": "a"}, KeysetPagination.SORT, 5)
+        advisor.record({"category_id": "b"}, KeysetPagination.SORT, 80)
+        advisor.record({"source_id": "a"}, KeysetPagination.SORT, 1)
+        stats = sorted(advisor._shapes.values(), key=lambda s: s["count"], reverse=True)
+        assert [s["count"] for s in stats] == [2, 1]
+        assert stats[0]["slow"] == 1
+        assert stats[0]["sample"][0] == {"category_id": "b"}
+    
+    def test_covered_by_index_prefix_in_either_direction(self):
+        existing = [[("category_id", 1), ("created_at", -1), ("_id", -1)]]
+        assert IndexAdvisor._covered([("category_id", 1)], existing)
+        assert IndexAdvisor._covered([("category_id", -1), ("created_at", 1), ("_id", 1)], existing)
+        assert not IndexAdvisor._covered([("source_id", 1)], existing)
+
+def test_summarize_plan():
+    explain = {
+        "queryPlanner": {"winningPlan": {
+            "stage": "FETCH",
+            "inputStage": {"stage": "IXSCAN", "indexName": "category_id_1"}
+        }},
+        "executionStats": {"totalKeysExamined": 10, "totalDocsExamined": 10, "nReturned": 10, "executionTimeMillis": 1}
+    }
+    assert summarize_plan(explain) == {
+        "plan": "FETCH <- IXSCAN(category_id_1)",
+        "keys_examined": 10,
+        "docs_examined": 10,
+        "returned": 10,
+        "time_ms": 1
+    }
+
+@pytest.mark.asyncio
+async def test_report_proposes_uncovered_indexes(test_db):
+    """Shapes without a matching index produce a proposal that apply() creates"""
+    advisor = IndexAdvisor(slow_ms=0)
+    await test_db["questions"].insert_one({"category_id": "c", "source_id": "s", "created_at": datetime.utcnow()})
+    advisor.record({"category_id": "c", "source_id": "s"}, KeysetPagination.SORT, 1)
+    
+    report = await advisor.report(test_db)
+    assert report["proposals"] == [{
+        "keys": [("category_id", 1), ("source_id", 1), ("created_at", 1), ("_id", 1)],
+        "count": 1
+    }]
+    assert "plan" in report["shapes"][0]["explain"]
+    
+    assert len(await advisor.apply(test_db)) == 1
+    assert (await advisor.report(test_db))["proposals"] == []
@@ -1,4 +1,5 @@
 import pytest
+import json
 from app.services.question_service import QuestionService
 from app.services.category_service import CategoryService
 from app.services.bulk_service import BulkService
@@ -28,7 +29,10 @@ async def test_full_workflow(test_db):
     assert question.text == "Test question"
     
     # Bulk export
-    exported = await bulk_service.bulk_export({"category_id": str(category.id)})
+    body = b"".join([
+        chunk async for chunk in bulk_service.stream_export({"category_id": str(category.id)})
+    ])
+    exported = json.loads(body)["data"]
     assert len(exported) >= 1
     assert exported[0]["text"] == "Test question"
 
@@ -0,0 +1,103 @@
+import pytest
+import asyncio
+from bson import ObjectId
+from datetime import datetime, timedelta
+from app.jobs import JobRunner, JobService, JobStatus, JobType
+from app.services.bulk_service import BulkService
+
+async def wait_for_job(service: JobService, job_id: str) -> dict:
+    for _ in range(100):
+        job = await service.get_job(job_id)
+        if job["status"] not in (JobStatus.QUEUED.value, JobStatus.RUNNING.value):
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError("Job did not finish")
+
+@pytest.mark.asyncio
+async def test_delete_job_records_progress(test_db):
+    """Test a background delete job runs to completion and saves counts"""
+    bulk_service = BulkService(test_db)
+    await bulk_service.bulk_import([
+        {"text": f"Job {i}", "category_id": "cat_1", "source_id": "src_1", "correct_answer": "A"}
+        for i in range(5)
+    ])
+    ids = [str(q["_id"]) for q in await test_db["questions"].find().to_list(None)]
+    service = JobService(test_db)
+    runner = JobRunner(concurrency=1)
+    
+    job_id = await service.create_job(JobType.DELETE, total=len(ids) + 1)
+    runner.submit(test_db, job_id, lambda: bulk_service.delete_batches(ids + ["missing"]))
+    job = await wait_for_job(service, job_id)
+    
+    assert job["status"] == JobStatus.COMPLETED.value
+    assert job["processed"] == 6
+    assert job["succeeded"] == 5
+    assert job["failed"] == 1
+    assert job["finished_at"] is not None
+
+@pytest.mark.asyncio
+async def test_cancel_queued_job(test_db):
+    """Test a job cancelled before it starts never runs"""
+    service = JobService(test_db)
+    runner = JobRunner()
+    calls = []
+    
+    async def batches():
+        calls.append(True)
+        yield {"processed": 1, "succeeded": 1, "failed": 0, "errors": []}
+    
+    job_id = await service.create_job(JobType.IMPORT)
+    await service.request_cancel(job_id)
+    runner.submit(test_db, job_id, batches)
+    await runner.shutdown()
+    
+    job = await service.get_job(job_id)
+    assert job["status"] == JobStatus.CANCELLED.value
+    assert calls == []
+
+@pytest.mark.asyncio
+async def test_cancel_running_job_closes_batches(test_db):
+    """Test cancelling a running job stops and closes its batch generator"""
+    service = JobService(test_db)
+    runner = JobRunner()
+    produced = []
+    closed = []
+    
+    async def batches():
+        try:
+            for _ in range(3):
+                # Cancellation is seen when the first chunk's progress is recorded
+                await service.request_cancel(job_id)
+                produced.append(True)
+                yield {"processed": 1, "succeeded": 1, "failed": 0, "errors": []}
+        finally:
+            job = await service.get_job(job_id)
+            closed.append(job["status"])
+    
+    job_id = await service.create_job(JobType.IMPORT)
+    runner.submit(test_db, job_id, batches)
+    job = await wait_for_job(service, job_id)
+    
+    assert job["status"] == JobStatus.CANCELLED.value
+    assert job["processed"] == 1
+    assert len(produced) == 1
+    # Closed by the runner before the final status is written
+    assert closed == [JobStatus.RUNNING.value]
+
+@pytest.mark.asyncio
+async def test_fail_stale_jobs(test_db):
+    """Test jobs left queued or running by a stopped process are failed; live ones are kept"""
+    service = JobService(test_db)
+    stale_id = await service.create_job(JobType.IMPORT)
+    live_id = await service.create_job(JobType.UPDATE)
+    await test_db["jobs"].update_one(
+        {"_id": ObjectId(stale_id)},
+        {"$set": {"status": JobStatus.RUNNING.value, "heartbeat_at": datetime.utcnow() - timedelta(hours=1)}}
+    )
+    
+    assert await service.fail_stale(stale_after=60) == 1
+    
+    stale = await service.get_job(stale_id)
+    assert stale["status"] == JobStatus.FAILED.value
+    assert stale["error"]
+    assert (await service.get_job(live_id))["status"] == JobStatus.QUEUED.value
@@ -44,6 +44,43 @@ async def test_get_question(test_db):
     assert retrieved is not None
     assert retrieved.text == "Test question"
 
+@pytest.mark.asyncio
+async def test_get_questions_batch(test_db):
+    """Batch get keeps request order, projects fields and reports missing IDs"""
+    service = QuestionService(test_db)
+    
+    result = await test_db["questions"].insert_many([
+        {"text": f"Q{i}", "explanation": "long", "metadata": {"difficulty": "easy"}}
+        for i in range(3)
+    ])
+    ids = [str(object_id) for object_id in result.inserted_ids]
+    missing = "507f1f77bcf86cd799439011"
+    
+    batch = await service.get_questions([ids[2], missing, ids[0], ids[2]], ["text"])
+    
+    assert [item["text"] for item in batch["items"]] == ["Q2", "Q0"]
+    assert "explanation" not in batch["items"][0]
+    assert batch["missing"] == [missing]
+    
+    with pytest.raises(ValueError):
+        await service.get_questions(["bad-id"])
+
+@pytest.mark.asyncio
+async def test_raw_reads_hide_fingerprint(test_db):
+    """The stored fingerprint never appears in batch gets or unvalidated listings"""
+    service = QuestionService(test_db)
+    result = await test_db["questions"].insert_one(
+        {"text": "Q", "fingerprint": "abc", "created_at": datetime.utcnow()}
+    )
+    
+    batch = await service.get_questions([str(result.inserted_id)])
+    listing = await service.list_questions(page=1, page_size=10, validate=False)
+    keyset = await service.list_questions(page=1, page_size=10, cursor="", validate=False)
+    
+    assert batch["items"][0]["text"] == "Q"
+    for item in batch["items"] + listing["items"] + keyset["items"]:
+        assert "fingerprint" not in item
+
 @pytest.mark.asyncio
 async def test_update_question(test_db):
     """Test updating a question"""
@@ -110,3 +147,54 @@ async def test_list_questions(test_db):
     assert len(result.items) == 3
     assert result.page == 1
     assert result.page_size == 3
+
+@pytest.mark.asyncio
+async def test_list_questions_with_cursor(test_db):
+    """Following next_cursor visits every question once, in creation order"""
+    service = QuestionService(test_db)
+    
+    for i in range(7):
+        await service.create_question({
+            "text": f"Question {i}",
+            "category_id": "cat_1",
+            "source_id": "src_1",
+            "correct_answer": "A",
+            "metadata": {"difficulty": "easy"}
+        })
+    
+    first = await service.list_questions(1, 3)
+    assert first.next_cursor is not None
+    
+    seen = [item.text for item in first.items]
+    cursor = first.next_cursor
+    while cursor:
+        result = await service.list_questions(1, 3, cursor=cursor)
+        assert result.total is None
+        seen.extend(item.text for item in result.items)
+        cursor = result.next_cursor
+    
+    assert seen == [f"Question {i}" for i in range(7)]
+
+@pytest.mark.asyncio
+async def test_list_questions_with_fields(test_db):
+    """fields trims each listed question and still pages by cursor"""
+    service = QuestionService(test_db)
+    
+    for i in range(3):
+        await service.create_question({
+            "text": f"Question {i}",
+            "category_id": "cat_1",
+            "source_id": "src_1",
+            "correct_answer": "A",
+            "explanation": "A long explanation",
+            "metadata": {"difficulty": "easy"}
+        })
+    
+    result = await service.list_questions(1, 2, fields=["text", "metadata.difficulty"])
+    
+    assert result.total == 3
+    assert set(result.items[0]) == {"_id", "text", "metadata", "created_at"}
+    assert result.items[0]["metadata"] == {"difficulty": "easy"}
+    
+    rest = await service.list_questions(1, 2, cursor=result.next_cursor, fields=["text"])
+    assert [item["text"] for item in rest.items] == ["Question 2"]
@@ -0,0 +1,108 @@
+from app.search_index import SearchIndex, edit_distance, tokenize
+
+def make_index(*questions):
+    index = SearchIndex()
+    index.ready = True
+    for question in questions:
+        index.index(question)
+    return index
+
+class TestTokenize:
+    def test_normalizes_case_and_punctuation(self):
+        assert tokenize("What is Photosynthesis?  CO₂!") == ["what", "is", "photosynthesis", "co2"]
+
+class TestEditDistance:
+    def test_distance_and_cutoff(self):
+        assert edit_distance("photosynthsis", "photosynthesis", 2) == 1
+        assert edit_distance("kitten", "sitting", 3) == 3
+        assert edit_distance("kitten", "sitting", 1) == 2
+
+class TestSearchIndex:
+    def test_ranks_rarer_and_repeated_terms_higher(self):
+        index = make_index(
+            {"_id": "q1", "text": "Cell biology basics", "explanation": "cells divide"},
+            {"_id": "q2", "text": "Mitochondria: the mitochondria of the cell"},
+            {"_id": "q3", "text": "Cell walls", "metadata": {"tags": ["mitochondria"]}}
+        )
+        total, ranked = index.search("mitochondria cell", 10)
+        assert total == 3
+        assert [question_id for question_id, _ in ranked][:2] == ["q2", "q3"]
+
+    def test_indexes_explanation_and_tags(self):
+        index = make_index(
+            {"_id": "q1", "text": "Q", "explanation": "Krebs cycle"},
+            {"_id": "q2", "text": "Q", "metadata": {"tags": ["krebs"]}}
+        )
+        total, ranked = index.search("krebs", 10)
+        assert total == 2
+        assert {question_id for question_id, _ in ranked} == {"q1", "q2"}
+
+    def test_update_replaces_terms(self):
+        index = make_index({"_id": "q1", "text": "Old wording"})
+        index.index({"_id": "q1", "text": "New wording"})
+        assert index.search("old", 10) == (0, [])
+        assert index.search("new", 10)[0] == 1
+        assert len(index) == 1
+
+    def test_remove_and_compaction(self):
+        questions = [{"_id": f"q{i}", "text": f"shared term{i}"} for i in range(3000)]
+        index = make_index(*questions)
+        for i in range(2500):
+            index.remove(f"q{i}")
+        total, ranked = index.search("shared", 5)
+        assert total == 500
+        assert len(index) == 500
+        assert len(index._ids) < 3000
+        assert index.search("term2999", 1)[1][0][0] == "q2999"
+
+    def test_limit_keeps_best_matches(self):
+        index = make_index(*[{"_id": f"q{i}", "text": "atom " * (i + 1)} for i in range(10)])
+        total, ranked = index.search("atom", 3)
+        assert total == 10
+        assert len(ranked) == 3
+
+    def test_ignores_writes_until_loaded(self):
+        index = SearchIndex()
+        index.index({"_id": "q1", "text": "atom"})
+        assert len(index) == 0
+
+    def test_fuzzy_search_tolerates_typos(self):
+        index = make_index(
+            {"_id": "q1", "text": "What drives photosynthesis?"},
+            {"_id": "q2", "text": "Define photosphere"},
+            {"_id": "q3", "text": "Unrelated"}
+        )
+        assert index.search("photosynthsis", 10) == (0, [])
+        total, ranked = index.fuzzy_search("photosynthsis", 10)
+        assert total == 1
+        assert ranked[0][0] == "q1"
+
+    def test_fuzzy_search_prefers_exact_terms(self):
+        index = make_index(
+            {"_id": "q1", "text": "cell wall"},
+            {"_id": "q2", "text": "cells"}
+        )
+        total, ranked = index.fuzzy_search("cell", 10)
+        assert total == 2
+        assert ranked[0][0] == "q1"
+
+    def test_substring_search_matches_fragments(self):
+        index = make_index(
+            {"_id": "q1", "text": "What is 2+2?", "explanation": "Basic addition"},
+            {"_id": "q2", "text": "What is 22?", "metadata": {"tags": ["Addition"]}},
+            {"_id": "q3", "text": "Subtraction"}
+        )
+        assert index.substring_search("2+2", 10) == (1, [("q1", 1.0)])
+        total, ranked = index.substring_search("ADDIT", 10)
+        assert total == 2
+        assert {question_id for question_id, _ in ranked} == {"q1", "q2"}
+        assert index.substring_search("22?", 10)[0] == 1
+
+    def test_substring_search_survives_updates_and_compaction(self):
+        index = make_index(*[{"_id": f"q{i}", "text": f"fragment {i}"} for i in range(3000)])
+        index.index({"_id": "q1", "text": "renamed"})
+        for i in range(2, 2600):
+            index.remove(f"q{i}")
+        assert index.substring_search("fragment", 1000)[0] == 401
+        assert index.substring_search("renam", 10)[1][0][0] == "q1"
+        assert index.substring_search("fragment 1", 10)[0] == 0
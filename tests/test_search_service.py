@@ -1,10 +1,13 @@
 import pytest
+from datetime import datetime
 from app.services.search_service import SearchService
+from main import create_indexes
 
 @pytest.mark.asyncio
 async def test_text_search(test_db):
     """Test text search functionality"""
     service = SearchService(test_db)
+    await create_indexes(test_db)
     
     # Create test data
     await test_db["questions"].insert_one({
@@ -12,7 +15,8 @@ async def test_text_search(test_db):
         "category_id": "bio_1",
         "source_id": "src_1",
         "correct_answer": "A",
-        "metadata": {"difficulty": "medium", "tags": ["biology"]}
+        "metadata": {"difficulty": "medium", "tags": ["biology"]},
+        "fingerprint": "abc"
     })
     
     # Search
@@ -21,6 +25,42 @@ async def test_text_search(test_db):
     assert result["total"] == 1
     assert len(result["items"]) == 1
     assert result["items"][0]["text"] == "What is photosynthesis?"
+    assert "fingerprint" not in result["items"][0]
+    assert "score" in result["items"][0]
+
+@pytest.mark.asyncio
+async def test_text_search_ranks_by_relevance(test_db):
+    """Matches in the question text outrank matches in the explanation"""
+    service = SearchService(test_db)
+    await create_indexes(test_db)
+    
+    await test_db["questions"].insert_many([
+        {"text": "Which organelle is involved?", "explanation": "Mitochondria produce energy",
+         "category_id": "bio_1", "source_id": "src_1", "correct_answer": "A", "metadata": {"tags": []}},
+        {"text": "What do mitochondria do?", "explanation": "Cell biology",
+         "category_id": "bio_1", "source_id": "src_1", "correct_answer": "A", "metadata": {"tags": []}}
+    ])
+    
+    result = await service.text_search("mitochondria", 1, 10)
+    
+    assert result["total"] == 2
+    assert result["items"][0]["text"] == "What do mitochondria do?"
+    assert result["items"][0]["score"] > result["items"][1]["score"]
+
+@pytest.mark.asyncio
+async def test_substring_search_escapes_regex(test_db):
+    """Substring mode matches the query literally"""
+    service = SearchService(test_db)
+    
+    await test_db["questions"].insert_many([
+        {"text": "What is 2+2?", "category_id": "cat_1", "source_id": "src_1", "correct_answer": "4"},
+        {"text": "What is 22?", "category_id": "cat_1", "source_id": "src_1", "correct_answer": "4"}
+    ])
+    
+    result = await service.text_search("2+2", 1, 10, mode="substring")
+    
+    assert result["total"] == 1
+    assert result["items"][0]["text"] == "What is 2+2?"
 
 @pytest.mark.asyncio
 async def test_search_by_difficulty(test_db):
@@ -59,3 +99,71 @@ async def test_get_statistics(test_db):
     assert stats["total_questions"] == 2
     assert "by_difficulty" in stats
     assert "by_category" in stats
+
+@pytest.mark.asyncio
+async def test_search_by_difficulty_with_cursor(test_db):
+    """An empty cursor starts keyset pagination from the beginning"""
+    service = SearchService(test_db)
+    
+    created_at = datetime(2024, 1, 1)
+    await test_db["questions"].insert_many([
+        {"text": f"Question {i}", "category_id": "cat_1", "source_id": "src_1", "correct_answer": "A",
+         "created_at": created_at, "metadata": {"difficulty": "easy" if i % 2 else "hard"}}
+        for i in range(9)
+    ])
+    
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        result = await service.search_by_difficulty("easy", 1, 2, cursor=cursor)
+        seen.extend(item["text"] for item in result["items"])
+        cursor = result["next_cursor"]
+    
+    assert seen == [f"Question {i}" for i in (1, 3, 5, 7)]
+
+@pytest.mark.asyncio
+async def test_advanced_search_total_modes(test_db):
+    """The total is exact by default, skipped or estimated on request"""
+    service = SearchService(test_db)
+    
+    await test_db["questions"].insert_many([
+        {"text": f"Question {i}", "category_id": "cat_1" if i < 4 else "cat_2", "source_id": "src_1",
+         "correct_answer": "A", "created_at": datetime(2024, 1, 1 + i)}
+        for i in range(6)
+    ])
+    
+    exact = await service.advanced_search({"category_id": "cat_1"}, 1, 3)
+    assert exact["total"] == 4
+    assert [item["text"] for item in exact["items"]] == ["Question 0", "Question 1", "Question 2"]
+    assert exact["next_cursor"] is not None
+    
+    skipped = await service.advanced_search({"category_id": "cat_1"}, 2, 3, include_total="false")
+    assert skipped["total"] is None
+    assert [item["text"] for item in skipped["items"]] == ["Question 3"]
+    assert skipped["next_cursor"] is None
+    
+    estimated = await service.advanced_search({}, 1, 3, include_total="estimated")
+    assert estimated["total"] == 6
+    assert len(estimated["items"]) == 3
+
+@pytest.mark.asyncio
+async def test_advanced_search_facets(test_db):
+    """Facet counts cover every match, not just the page"""
+    service = SearchService(test_db)
+    
+    await test_db["questions"].insert_many([
+        {"text": f"Question {i}", "category_id": "cat_1" if i < 3 else "cat_2", "source_id": "src_1",
+         "correct_answer": "A", "created_at": datetime(2024, 1, 1 + i),
+         "metadata": {"difficulty": "easy" if i % 2 else "hard", "tags": ["math"] + (["algebra"] if i < 2 else [])}}
+        for i in range(4)
+    ])
+    
+    filtered = await service.advanced_search({"category_id": "cat_1"}, 1, 1, facets=["tags", "difficulty"])
+    assert len(filtered["items"]) == 1
+    assert filtered["facets"] == {
+        "tags": [{"value": "math", "count": 3}, {"value": "algebra", "count": 2}],
+        "difficulty": [{"value": "hard", "count": 2}, {"value": "easy", "count": 1}]
+    }
+    
+    unfiltered = await service.advanced_search({}, 1, 1, facets=["category"])
+    assert unfiltered["facets"] == {"category": [{"value": "cat_1", "count": 3}, {"value": "cat_2", "count": 1}]}
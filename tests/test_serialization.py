@@ -0,0 +1,44 @@
+import json
+from datetime import datetime
+from bson import ObjectId
+from app.models import DifficultyLevel, Question
+from app.serialization import FastJSONResponse, dumps
+
+def stored_question(**overrides):
+    now = datetime(2024, 1, 2, 3, 4, 5, 678000)
+    return {
+        "_id": ObjectId("65a1b2c3d4e5f60718293a4b"),
+        "text": "Q",
+        "category_id": "cat_1",
+        "source_id": "src_1",
+        "type": "multiple_choice",
+        "options": ["A", "B"],
+        "correct_answer": "A",
+        "explanation": None,
+        "metadata": {
+            "tags": [],
+            "difficulty": DifficultyLevel.EASY,
+            "time_limit_seconds": None,
+            "passing_score": None,
+            "is_active": True
+        },
+        "created_at": now,
+        "updated_at": now,
+        **overrides
+    }
+
+class TestDumps:
+    def test_encodes_bson_types(self):
+        encoded = json.loads(dumps(stored_question()))
+        assert encoded["_id"] == "65a1b2c3d4e5f60718293a4b"
+        assert encoded["created_at"] == "2024-01-02T03:04:05.678000"
+        assert encoded["metadata"]["difficulty"] == "easy"
+
+    def test_matches_response_model_output(self):
+        question = stored_question()
+        validated = json.loads(Question(**question).json(by_alias=True))
+        assert json.loads(dumps(question)) == validated
+
+    def test_response_renders_with_orjson(self):
+        response = FastJSONResponse({"items": [stored_question()], "total": None})
+        assert json.loads(response.body)["items"][0]["_id"] == "65a1b2c3d4e5f60718293a4b"
@@ -0,0 +1,54 @@
+import pytest
+from app.statistics import StatisticsService, _decode_key, _encode_key
+
+class TestStatisticsDelta:
+    def test_moved_question_nets_out_unchanged_counters(self):
+        before = {"category_id": "cat_1", "source_id": "src_1", "metadata": {"difficulty": "easy"}}
+        after = {"category_id": "cat_2", "source_id": "src_1", "metadata": {"difficulty": "easy"}}
+        assert StatisticsService.delta(added=[after], removed=[before]) == {
+            "by_category.cat_2": 1,
+            "by_category.cat_1": -1
+        }
+
+    def test_escapes_dotted_and_missing_values(self):
+        inc = StatisticsService.delta(added=[{"category_id": "a.b", "source_id": "$src"}])
+        assert inc == {
+            "total": 1,
+            "by_difficulty.%null": 1,
+            "by_category.a%2Eb": 1,
+            "by_source.%24src": 1
+        }
+        inc = StatisticsService.delta(added=[{"category_id": "", "source_id": "%empty"}])
+        assert inc["by_category.%empty"] == 1
+        assert inc["by_source.%25empty"] == 1
+
+    def test_keys_round_trip(self):
+        for value in ["", "%empty", "null", "%null", "a.b", "$src", "100%", None]:
+            assert _decode_key(_encode_key(value)) == value
+
+@pytest.mark.asyncio
+async def test_record_and_reconcile(test_db):
+    """Recorded changes match a full recount"""
+    service = StatisticsService(test_db)
+    questions = [
+        {"text": "Q1", "category_id": "cat.1", "source_id": "src_1", "metadata": {"difficulty": "easy"}},
+        {"text": "Q2", "category_id": "cat_2", "source_id": "src_1", "metadata": {"difficulty": "hard"}}
+    ]
+    await service.reconcile()
+    await test_db["questions"].insert_many(questions)
+    await service.record(added=questions)
+
+    stats = await service.get_statistics()
+    assert stats == {
+        "total_questions": 2,
+        "by_difficulty": {"easy": 1, "hard": 1},
+        "by_category": {"cat.1": 1, "cat_2": 1},
+        "by_source": {"src_1": 2}
+    }
+
+    await test_db["questions"].delete_one({"text": "Q2"})
+    await service.record(removed=[questions[1]])
+    counted = await service.get_statistics()
+    await service.reconcile()
+    assert counted == await service.get_statistics()
+    assert counted["by_category"] == {"cat.1": 1}
@@ -0,0 +1,99 @@
+import gzip
+import json
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from app.streaming import (
+    InvalidRow,
+    StreamFormatError,
+    gzip_chunks,
+    iter_json_array_rows,
+    iter_ndjson_rows,
+    json_default,
+)
+
+class FakeUpload:
+    """Serves an upload in small fixed-size chunks regardless of the requested size"""
+
+    def __init__(self, data: bytes, chunk_size: int = 7):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.offset = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        chunk = self.data[self.offset:self.offset + self.chunk_size]
+        self.offset += len(chunk)
+        return chunk
+
+async def collect(rows):
+    return [row async for row in rows]
+
+@pytest.mark.asyncio
+async def test_json_array_rows_across_chunk_boundaries():
+    """Test array elements split over many chunks are reassembled"""
+    data = b'[{"text": "Caf\xc3\xa9?", "n": 12345}, {"text": "Q2"},\n 678, "x"]  '
+    
+    rows = await collect(iter_json_array_rows(FakeUpload(data)))
+    
+    assert rows == [{"text": "Café?", "n": 12345}, {"text": "Q2"}, 678, "x"]
+
+@pytest.mark.asyncio
+async def test_json_array_numbers_split_at_every_offset():
+    """Test top-level numbers split inside a sign, fraction or exponent are reassembled"""
+    data = b'[-1.5e3, 1e5, 42, -0.25E-2, 7]'
+    
+    for split in range(1, len(data)):
+        upload = FakeUpload(data, chunk_size=split)
+        rows = await collect(iter_json_array_rows(upload))
+        assert rows == [-1500.0, 100000.0, 42, -0.0025, 7], split
+
+@pytest.mark.asyncio
+async def test_json_array_empty():
+    """Test empty array yields nothing"""
+    assert await collect(iter_json_array_rows(FakeUpload(b" [ ] "))) == []
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("data", [b'{"text": "Q1"}', b"", b'[{"a": 1} {"b": 2}]', b'[{"a": 1},', b'[1] 2'])
+async def test_json_array_malformed(data):
+    """Test structural errors raise StreamFormatError"""
+    with pytest.raises(StreamFormatError):
+        await collect(iter_json_array_rows(FakeUpload(data)))
+
+@pytest.mark.asyncio
+async def test_ndjson_rows_skip_blank_lines_and_flag_bad_rows():
+    """Test NDJSON parsing reports malformed lines as InvalidRow"""
+    data = b'{"text": "Q1"}\n\n{"text": broken}\r\n{"text": "Q3"}'
+    
+    rows = await collect(iter_ndjson_rows(FakeUpload(data)))
+    
+    assert rows[0] == {"text": "Q1"}
+    assert isinstance(rows[1], InvalidRow)
+    assert rows[2] == {"text": "Q3"}
+    assert len(rows) == 3
+
+@pytest.mark.asyncio
+async def test_ndjson_null_line_is_a_row():
+    """Test a literal null line is passed on for validation, keeping row numbers aligned"""
+    data = b'{"a": 1}\nnull\n\n{"b": 2}\n'
+    
+    rows = await collect(iter_ndjson_rows(FakeUpload(data)))
+    
+    assert rows == [{"a": 1}, None, {"b": 2}]
+
+@pytest.mark.asyncio
+async def test_gzip_chunks_round_trip():
+    """Test on-the-fly gzip output decompresses to the input"""
+    async def chunks():
+        for i in range(100):
+            yield f'{{"row": {i}}}\n'.encode()
+    
+    compressed = b"".join(await collect(gzip_chunks(chunks())))
+    
+    assert gzip.decompress(compressed).count(b"\n") == 100
+
+def test_json_default_handles_bson_types():
+    """Test ObjectId and datetime are serialized"""
+    oid = ObjectId()
+    encoded = json.dumps({"_id": oid, "at": datetime(2024, 1, 2, 3, 4, 5)}, default=json_default)
+    
+    assert json.loads(encoded) == {"_id": str(oid), "at": "2024-01-02T03:04:05"}
@@ -0,0 +1,117 @@
+import re
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from app.utils import apply_set, question_fingerprint, ETagHelper, KeysetPagination, ProjectionHelper, SearchFilters
+
+class TestQuestionFingerprint:
+    question = {
+        "text": "What is 2+2?",
+        "category_id": "cat_1",
+        "source_id": "src_1",
+        "options": ["3", "4"],
+        "correct_answer": "4"
+    }
+    
+    def test_ignores_case_whitespace_and_option_order(self):
+        variant = dict(self.question, text="  what IS  2+2? ", options=["4", "3"])
+        assert question_fingerprint(variant) == question_fingerprint(self.question)
+    
+    def test_ignores_non_content_fields(self):
+        variant = dict(self.question, explanation="Because", metadata={"difficulty": "hard"})
+        assert question_fingerprint(variant) == question_fingerprint(self.question)
+    
+    def test_differs_by_content_fields(self):
+        base = question_fingerprint(self.question)
+        assert question_fingerprint(dict(self.question, correct_answer="3")) != base
+        assert question_fingerprint(dict(self.question, category_id="cat_2")) != base
+        assert question_fingerprint(dict(self.question, options=["3", "4", "5"])) != base
+
+class TestApplySet:
+    def test_applies_dotted_paths_without_mutating(self):
+        document = {"text": "Q", "options": ["3", "4"], "metadata": {"difficulty": "easy", "tags": ["a"]}}
+        result = apply_set(document, {"metadata.difficulty": "hard", "options.1": "5", "explanation": "E"})
+        assert result == {
+            "text": "Q", "options": ["3", "5"], "explanation": "E",
+            "metadata": {"difficulty": "hard", "tags": ["a"]}
+        }
+        assert document["metadata"]["difficulty"] == "easy"
+        assert document["options"] == ["3", "4"]
+    
+    def test_creates_missing_parents_and_skips_invalid_array_steps(self):
+        assert apply_set({}, {"metadata.difficulty": "hard"}) == {"metadata": {"difficulty": "hard"}}
+        assert apply_set({"options": ["3"]}, {"options.x": "5"}) == {"options": ["3"]}
+
+class TestBuildTextSearch:
+    def test_text_mode_uses_text_index(self):
+        assert SearchFilters.build_text_search("cell") == {"$text": {"$search": "cell"}}
+    
+    def test_substring_mode_escapes_regex(self):
+        filters = SearchFilters.build_text_search("a.*(b", mode="substring")
+        pattern = filters["$or"][0]["text"]["$regex"]
+        assert re.search(pattern, "x a.*(b y")
+        assert not re.search(pattern, "aXXb")
+
+class TestBuildFacets:
+    def test_unwinds_tags_only(self):
+        facets = SearchFilters.build_facets(["tags", "category"])
+        assert facets["tags"][0] == {"$unwind": "$metadata.tags"}
+        assert facets["category"][0] == {"$group": {"_id": "$category_id", "count": {"$sum": 1}}}
+    
+    def test_rejects_unknown_facet(self):
+        with pytest.raises(ValueError):
+            SearchFilters.build_facets(["author"])
+
+class TestKeysetPagination:
+    def test_cursor_round_trip(self):
+        item = {"_id": ObjectId(), "created_at": datetime(2024, 5, 1, 12, 30, 0, 123000)}
+        cursor = KeysetPagination.encode_cursor(item)
+        assert KeysetPagination.decode_cursor(cursor) == (item["created_at"], item["_id"])
+    
+    def test_empty_cursor_starts_at_beginning(self):
+        assert KeysetPagination.apply_cursor({"category_id": "c"}, "") == {"category_id": "c"}
+    
+    def test_cursor_combines_with_filters(self):
+        item = {"_id": ObjectId(), "created_at": datetime(2024, 5, 1)}
+        filters = KeysetPagination.apply_cursor({"category_id": "c"}, KeysetPagination.encode_cursor(item))
+        assert filters["$and"][0] == {"category_id": "c"}
+        assert filters["$and"][1]["$or"][1] == {"created_at": item["created_at"], "_id": {"$gt": item["_id"]}}
+    
+    def test_invalid_cursor(self):
+        with pytest.raises(ValueError):
+            KeysetPagination.decode_cursor("not-a-cursor")
+
+class TestProjectionHelper:
+    def test_builds_inclusion_projection(self):
+        projection = ProjectionHelper.build_projection(["_id", "text", "metadata.difficulty"])
+        assert projection == {"text": 1, "metadata.difficulty": 1}
+        assert ProjectionHelper.build_projection(None) is None
+
+    def test_parses_fields_and_adds_required(self):
+        fields = ProjectionHelper.parse_fields(" text, ,metadata.difficulty")
+        assert fields == ["text", "metadata.difficulty"]
+        assert ProjectionHelper.build_projection(fields, required=("created_at",)) == {
+            "created_at": 1, "text": 1, "metadata.difficulty": 1
+        }
+        assert ProjectionHelper.parse_fields(None) is None
+
+    def test_rejects_unknown_fields(self):
+        with pytest.raises(ValueError):
+            ProjectionHelper.build_projection(["password"])
+        with pytest.raises(ValueError):
+            ProjectionHelper.build_projection(["metadata.$"])
+
+class TestETagHelper:
+    def test_document_etag_changes_with_updated_at(self):
+        object_id = ObjectId()
+        first = ETagHelper.document_etag(object_id, datetime(2024, 1, 1))
+        assert first == ETagHelper.document_etag(object_id, datetime(2024, 1, 1))
+        assert first != ETagHelper.document_etag(object_id, datetime(2024, 1, 2))
+        assert first.startswith('"') and first.endswith('"')
+
+    def test_matches_lists_weak_and_wildcard(self):
+        etag = ETagHelper.list_etag(3, datetime(2024, 1, 1))
+        assert ETagHelper.matches(f'"other", W/{etag}', etag)
+        assert ETagHelper.matches("*", etag)
+        assert not ETagHelper.matches('"other"', etag)
+        assert not ETagHelper.matches(None, etag)
@@ -1,5 +1,6 @@
 import pytest
 from app.validators import QuestionValidator, CategoryValidator, SourceValidator
+from app.validators import ValidationPool, validate_question_rows
 
 class TestQuestionValidator:
     def test_validate_question_text_valid(self):
@@ -64,3 +65,41 @@ class TestSourceValidator:
     def test_validate_year_invalid(self):
         with pytest.raises(ValueError, match="Invalid year"):
             SourceValidator.validate_year(1850)
+
+class TestValidateQuestionRows:
+    valid_row = {
+        "text": "  What is 2+2?  ",
+        "category_id": "cat_1",
+        "source_id": "src_1",
+        "options": ["3", "4"],
+        "correct_answer": "4"
+    }
+    
+    def test_normalizes_valid_rows(self):
+        documents, errors = validate_question_rows([(7, self.valid_row)])
+        assert errors == []
+        assert documents[0][0] == 7
+        assert documents[0][1]["text"] == "What is 2+2?"
+        assert documents[0][1]["metadata"]["difficulty"] == "medium"
+    
+    def test_reports_errors_per_row(self):
+        rows = [
+            (0, "not an object"),
+            (1, {"text": "Missing fields"}),
+            (2, dict(self.valid_row, correct_answer="5")),
+            (3, self.valid_row)
+        ]
+        documents, errors = validate_question_rows(rows)
+        assert [idx for idx, _ in documents] == [3]
+        assert [e["row"] for e in errors] == [0, 1, 2]
+        assert "category_id" in errors[1]["error"]
+
+@pytest.mark.asyncio
+async def test_validation_pool_matches_inline():
+    """Test validation in worker processes gives the same result as inline"""
+    pool = ValidationPool(max_workers=2, inline_rows=1)
+    rows = [(i, dict(TestValidateQuestionRows.valid_row)) for i in range(50)] + [(50, "bad")]
+    try:
+        assert await pool.validate(rows) == validate_question_rows(rows)
+    finally:
+        pool.shutdown()